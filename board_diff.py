@@ -0,0 +1,217 @@
+from collections import Counter
+from dataclasses import dataclass, field, replace
+
+from model import Coord, ComponentInstance, Jumper, Trace
+from grid import Grid
+
+# Цвета оверлея: старое положение изменённых объектов и новое
+COLOR_OLD = "#ff5555"
+COLOR_NEW = "#55ff55"
+
+
+@dataclass
+class Change:
+    kind: str  # "grid", "component", "jumper", "trace"
+    key: str   # ref или id; для grid — поле или "cut"
+    what: str  # "added", "removed", "moved", "rotated", "changed"
+    detail: str = ""
+
+
+@dataclass
+class BoardDiff:
+    changes: list[Change] = field(default_factory=list)
+    errors_added: list[str] = field(default_factory=list)
+    errors_removed: list[str] = field(default_factory=list)
+    # объекты для оверлея: (components, jumpers, traces) старой и новой платы
+    old_marked: tuple[list, list, list] = field(default_factory=lambda: ([], [], []))
+    new_marked: tuple[list, list, list] = field(default_factory=lambda: ([], [], []))
+
+
+def _xy(c: Coord) -> str:
+    return f"({c.x},{c.y})"
+
+
+def _anchors(obj) -> str:
+    text = ", ".join(f"{slot}={ref}.{pin}" for slot, (ref, pin) in sorted(obj.anchors.items()))
+    return text or "none"
+
+
+# поля Grid и их имена в board.yaml
+_GRID_FIELDS = (
+    ("width", "width"),
+    ("height", "height"),
+    ("type", "kind"),
+    ("tracks", "tracks"),
+    ("min_clearance", "min_clearance"),
+)
+
+
+def _diff_grid(old: Grid, new: Grid, d: BoardDiff) -> None:
+    for name, attr in _GRID_FIELDS:
+        a, b = getattr(old, attr), getattr(new, attr)
+        if a != b:
+            d.changes.append(Change("grid", name, "changed", f"{a} -> {b}"))
+    for c in sorted(new.cuts - old.cuts, key=lambda c: (c.y, c.x)):
+        d.changes.append(Change("grid", "cut", "added", _xy(c)))
+    for c in sorted(old.cuts - new.cuts, key=lambda c: (c.y, c.x)):
+        d.changes.append(Change("grid", "cut", "removed", _xy(c)))
+
+
+def _component_rest(c: ComponentInstance) -> tuple:
+    # всё, кроме положения и поворота; библиотека общая, так что
+    # одинаковые футпринты — это один и тот же объект
+    return (id(c.footprint), c.bbox, tuple(sorted(c.nets.items())))
+
+
+def _diff_components(old: list[ComponentInstance], new: list[ComponentInstance], d: BoardDiff) -> None:
+    by_ref = {c.ref: c for c in old}
+    seen: set[str] = set()
+    for c in new:
+        seen.add(c.ref)
+        o = by_ref.get(c.ref)
+        if o is None:
+            d.changes.append(Change("component", c.ref, "added", f"at {_xy(c.origin)}"))
+            d.new_marked[0].append(c)
+            continue
+        changed = False
+        if o.origin != c.origin:
+            d.changes.append(Change("component", c.ref, "moved", f"{_xy(o.origin)} -> {_xy(c.origin)}"))
+            changed = True
+        if o.rotation != c.rotation:
+            d.changes.append(Change("component", c.ref, "rotated", f"{o.rotation} -> {c.rotation}"))
+            changed = True
+        if _component_rest(o) != _component_rest(c):
+            if o.footprint is not c.footprint:
+                detail = f"footprint {o.footprint.name} -> {c.footprint.name}"
+            elif o.nets != c.nets:
+                detail = "nets"
+            else:
+                detail = "bbox"
+            d.changes.append(Change("component", c.ref, "changed", detail))
+            changed = True
+        if changed:
+            d.old_marked[0].append(o)
+            d.new_marked[0].append(c)
+    for o in old:
+        if o.ref not in seen:
+            d.changes.append(Change("component", o.ref, "removed", f"from {_xy(o.origin)}"))
+            d.old_marked[0].append(o)
+
+
+def _diff_wiring(kind: str, slot: int, old: list, new: list, ident, geometry, d: BoardDiff) -> None:
+    """Jumpers or traces: matched by id, compared by net, geometry and anchors."""
+    by_id = {ident(o): o for o in old}
+    seen: set[str] = set()
+    for n in new:
+        key = ident(n)
+        seen.add(key)
+        o = by_id.get(key)
+        if o is None:
+            d.changes.append(Change(kind, key, "added", n.net))
+            d.new_marked[slot].append(n)
+            continue
+        changed = False
+        if o.net != n.net:
+            d.changes.append(Change(kind, key, "changed", f"net {o.net} -> {n.net}"))
+            changed = True
+        if geometry(o) != geometry(n):
+            d.changes.append(Change(kind, key, "moved"))
+            changed = True
+        if o.anchors != n.anchors:
+            # конец перевязан с пина на клетку или наоборот, даже если не сдвинулся
+            d.changes.append(Change(kind, key, "changed", f"anchors {_anchors(o)} -> {_anchors(n)}"))
+            changed = True
+        if changed:
+            d.old_marked[slot].append(o)
+            d.new_marked[slot].append(n)
+    for o in old:
+        if ident(o) not in seen:
+            d.changes.append(Change(kind, ident(o), "removed", o.net))
+            d.old_marked[slot].append(o)
+
+
+def diff_boards(
+    old: tuple[Grid, list[ComponentInstance], list[Jumper], list[Trace]],
+    new: tuple[Grid, list[ComponentInstance], list[Jumper], list[Trace]],
+    old_errors: list[str],
+    new_errors: list[str],
+) -> BoardDiff:
+    """Changes from old to new, in one pass over each board.
+
+    Grid fields and cuts are compared first. Components are matched by
+    ref, jumpers and traces by id, through dicts;
+    DRC messages are compared as multisets, so the whole diff is linear in
+    the number of objects and errors. Jumper colour is not compared: save
+    picks it at random for jumpers that have none.
+    """
+    old_grid, old_comps, old_jumpers, old_traces = old
+    new_grid, new_comps, new_jumpers, new_traces = new
+
+    d = BoardDiff()
+    _diff_grid(old_grid, new_grid, d)
+    _diff_components(old_comps, new_comps, d)
+    _diff_wiring(
+        "jumper", 1, old_jumpers, new_jumpers,
+        lambda j: j.jid, lambda j: (j.a, j.b), d,
+    )
+    _diff_wiring(
+        "trace", 2, old_traces, new_traces,
+        lambda t: t.tid, lambda t: t.points, d,
+    )
+
+    before = Counter(old_errors)
+    after = Counter(new_errors)
+    d.errors_added = [e for e, n in (after - before).items() for _ in range(n)]
+    d.errors_removed = [e for e, n in (before - after).items() for _ in range(n)]
+    return d
+
+
+def format_change(c: Change) -> str:
+    mark = {"added": "+", "removed": "-"}.get(c.what, "~")
+    text = f"{mark} {c.kind} {c.key} {c.what}"
+    return f"{text} {c.detail}" if c.detail else text
+
+
+def render_diff(
+    old: tuple[Grid, list[ComponentInstance], list[Jumper], list[Trace]],
+    new: tuple[Grid, list[ComponentInstance], list[Jumper], list[Trace]],
+    diff: BoardDiff,
+    filename: str = "board_diff.svg",
+) -> None:
+    """The new board with changed objects drawn over it: old place in red,
+    new place in green. Only DRC errors that appeared are marked."""
+    from render_svg import (
+        build_scene,
+        render_component_boxes,
+        render_jumpers,
+        render_pins,
+        render_traces,
+        write_scene,
+    )
+
+    old_grid = old[0]
+    grid, components, jumpers, traces = new
+    grid = replace(
+        grid,
+        width=max(grid.width, old_grid.width),
+        height=max(grid.height, old_grid.height),
+    )
+    scene = build_scene(grid, components, diff.errors_added, jumpers, traces)
+
+    # CSS перекрывает атрибуты fill/stroke, которые пишут render_*
+    out = [
+        "<style>"
+        f".diff-old *{{stroke:{COLOR_OLD}}} .diff-old circle{{fill:{COLOR_OLD}}} "
+        f".diff-new *{{stroke:{COLOR_NEW}}} .diff-new circle{{fill:{COLOR_NEW}}}"
+        "</style>\n"
+    ]
+    for cls, (comps, jmps, trs) in (("diff-old", diff.old_marked), ("diff-new", diff.new_marked)):
+        out.append(f'<g class="{cls}" opacity="0.8">\n')
+        render_component_boxes(out, comps, grid)
+        render_traces(out, trs, grid)
+        render_jumpers(out, jmps, grid)
+        render_pins(out, comps, grid, set())
+        out.append("</g>\n")
+    scene.layers.append("".join(out))
+
+    write_scene(scene, filename)
@@ -1,11 +1,14 @@
-from dataclasses import dataclass
+from collections import Counter
+from dataclasses import dataclass, field, replace
+from fnmatch import fnmatchcase
 import random
 
 from io_footprints import load_footprints
-from io_board import load_board, save_board
-from grid import check_placement, check_jumpers, check_traces
-from render_svg import render_svg
+from io_board import SaveCache, load_board
+from drc import check_region, covered_cells, run_drc
+from grid import net_cells
 from model import Coord, ComponentInstance, Jumper, Trace
+from transform import Transform, WiringIndex, attached_wiring, selection_bounds, transform_selection
 
 
 FOOTPRINTS_PATH = "footprints.yaml"
@@ -13,62 +16,192 @@ BOARD_PATH = "board.yaml"
 
 @dataclass
 class CLIState:
-    board_data: dict
     grid: object
     components: list[ComponentInstance]
     jumpers: list[Jumper]
     traces: list[Trace]
-    selected: ComponentInstance | None = None
+    selected: list[ComponentInstance] = field(default_factory=list)
     flip: bool = False
+    # изменённые с последнего save объекты: ("component", ref), ("jumper", id), ...
+    dirty: set[tuple[str, str]] = field(default_factory=set)
+    save_cache: SaveCache = field(default_factory=SaveCache)
+    # геометрия последнего render: flip только переписывает её другой стороной
+    scene: object = None
+    # результат последнего полного DRC; move/rotate/mirror правят его
+    # перепроверкой вокруг сдвинутого, не гоняя DRC по всей плате
+    errors: list[str] | None = None
+    # какая проводка сидит на каких деталях; строится при первом move
+    wiring: WiringIndex | None = None
+    # секции board.yaml, которых модель не знает: save пишет их обратно
+    sections: dict = field(default_factory=dict)
 
 
 def cmd_help(state: CLIState, parts: list[str]) -> bool:
     print("Commands:")
     print("  list                 - list components")
-    print("  select <ref>         - select component")
-    print("  move <dx> <dy>       - move selected component")
-    print("  render               - render board.svg")
+    print("  select <ref|glob> ...  - select components")
+    print("  select-net <net>     - select components with a pin on the net")
+    print("  select-rect <x1> <y1> <x2> <y2> - select components inside rectangle")
+    print("  select-none          - clear selection")
+    print("  move <dx> <dy>       - move selected components with their wiring")
+    print("  rotate <90|180|270>  - rotate selection around its center")
+    print("  mirror               - mirror selection left-right (symmetric footprints only)")
+    print("  render [both]        - render board.svg (both: board_front.svg and board_back.svg)")
+    print("  render-tiles [dir]   - render tiled zoomable view (default board_tiles/)")
     print("  flip                 - toggle board flip (view only)")
     print("  save                 - save board.yaml")
+    print("  clearance [n]        - show/set min free holes between nets")
+    print("  strip-cuts           - propose strip cuts separating nets (stripboard)")
+    print("  net <ref> <pin> [net] - assign net to a pin (no net: clear)")
+    print("  ratsnest             - list unrouted connections")
     print("  jumper-list          - list jumpers")
-    print("  jumper-add <id> <net> <x1> <y1> <x2> <y2> [color]")
+    print("  jumper-add <id> <net> <a> <b> [color] - point: <x> <y> or <ref>.<pin>")
     print("  jumper-del <id>")
     print("  trace-list           - list traces")
-    print("  trace-add <id> <net> <x1> <y1> <x2> <y2> [<x3> <y3> ...]")
+    print("  trace-add <id> <net> <p1> <p2> [<p3> ...] - point: <x> <y> or <ref>.<pin>")
     print("  trace-del <id>")
     print("  quit                 - exit")
     return True
 
 
 def cmd_list(state: CLIState, parts: list[str]) -> bool:
+    selected = {id(c) for c in state.selected}
     for c in state.components:
-        mark = "*" if c is state.selected else " "
+        mark = "*" if id(c) in selected else " "
         print(f"{mark} {c.ref} @ {c.origin}")
     return True
 
 
+def _set_selection(state: CLIState, found: list[ComponentInstance]) -> None:
+    state.selected = found
+    if not found:
+        print("nothing selected")
+    else:
+        print(f"selected {len(found)}: {' '.join(c.ref for c in found)}")
+
+
 def cmd_select(state: CLIState, parts: list[str]) -> bool:
+    if len(parts) < 2:
+        print("usage: select <ref|glob> ...")
+        return True
+
+    found = []
+    # по id, как в cmd_list: `in` по списку сравнивал бы поля каждой детали
+    seen: set[int] = set()
+    for pattern in parts[1:]:
+        matched = [c for c in state.components if fnmatchcase(c.ref, pattern)]
+        if not matched:
+            print(f"component '{pattern}' not found")
+        for c in matched:
+            if id(c) not in seen:
+                seen.add(id(c))
+                found.append(c)
+
+    if found:
+        _set_selection(state, found)
+    return True
+
+
+def cmd_select_net(state: CLIState, parts: list[str]) -> bool:
     if len(parts) != 2:
-        print("usage: select <ref>")
+        print("usage: select-net <net>")
         return True
 
-    ref = parts[1]
-    found = None
-    for c in state.components:
-        if c.ref == ref:
-            found = c
-            break
+    cells = net_cells(state.jumpers, state.traces, state.components).get(parts[1])
+    if not cells:
+        print(f"net '{parts[1]}' not found")
+        return True
 
-    if not found:
-        print(f"component '{ref}' not found")
-    else:
-        state.selected = found
-        print(f"selected {state.selected.ref}")
+    found = [
+        c for c in state.components
+        if any(p in cells for p in c.placed_pins())
+    ]
+    _set_selection(state, found)
+    return True
+
+
+def cmd_select_rect(state: CLIState, parts: list[str]) -> bool:
+    if len(parts) != 5:
+        print("usage: select-rect <x1> <y1> <x2> <y2>")
+        return True
+    try:
+        x1, y1, x2, y2 = (int(v) for v in parts[1:])
+    except ValueError:
+        print("x/y must be integers")
+        return True
+    min_x, max_x = sorted((x1, x2))
+    min_y, max_y = sorted((y1, y2))
+
+    found = [
+        c for c in state.components
+        if all(min_x <= p.x <= max_x and min_y <= p.y <= max_y for p in c.placed_pins())
+    ]
+    _set_selection(state, found)
+    return True
+
+
+def cmd_select_none(state: CLIState, parts: list[str]) -> bool:
+    state.selected = []
+    print("selection cleared")
+    return True
+
+
+def _wiring(state: CLIState) -> WiringIndex:
+    if state.wiring is None:
+        state.wiring = WiringIndex(state.components, state.jumpers, state.traces)
+    return state.wiring
+
+
+def _apply_to_selection(state: CLIState, t: Transform, what: str) -> bool:
+    """Move the selection with its wiring and recheck only around it.
+
+    The errors near the moved objects, before and after, are swapped in
+    the last full DRC result. Returns False if nothing was moved.
+    """
+    index = _wiring(state)
+    jumpers, traces = attached_wiring(state.selected, index)
+    # копии до сдвига: перепроверка «до» идёт по ним
+    old = {id(o): replace(o) for o in state.selected + jumpers}
+    old.update({id(tr): replace(tr, points=list(tr.points)) for tr in traces})
+    cells = covered_cells(state.selected, jumpers, traces)
+    try:
+        transform_selection(state.selected, state.jumpers, state.traces, t, index)
+    except ValueError as e:
+        print(e)
+        return False
+    state.dirty.update(("component", c.ref) for c in state.selected)
+    state.dirty.update(("jumper", j.jid) for j in jumpers)
+    state.dirty.update(("trace", tr.tid) for tr in traces)
+    refs = " ".join(c.ref for c in state.selected)
+    print(f"{what} {refs} ({len(jumpers)} jumper(s), {len(traces)} trace(s) attached)")
+
+    if state.errors is None:
+        return True
+    cells |= covered_cells(state.selected, jumpers, traces)
+    before = check_region(
+        state.grid,
+        [old.get(id(c), c) for c in state.components],
+        [old.get(id(j), j) for j in state.jumpers],
+        [old.get(id(tr), tr) for tr in state.traces],
+        cells,
+        [old[id(j)] for j in jumpers],
+        [old[id(tr)] for tr in traces],
+    )
+    after = check_region(
+        state.grid, state.components, state.jumpers, state.traces, cells, jumpers, traces
+    )
+    for e in after:
+        print(f"  {e}")
+    # как мультимножества: одинаковые сообщения бывают
+    errors = Counter(state.errors)
+    errors.subtract(before)
+    errors.update(after)
+    state.errors = [e for e, n in errors.items() for _ in range(n)]
     return True
 
 
 def cmd_move(state: CLIState, parts: list[str]) -> bool:
-    if state.selected is None:
+    if not state.selected:
         print("no component selected")
         return True
     if len(parts) != 3:
@@ -82,22 +215,93 @@ def cmd_move(state: CLIState, parts: list[str]) -> bool:
         print("dx and dy must be integers")
         return True
 
-    state.selected.origin = Coord(
-        state.selected.origin.x + dx,
-        state.selected.origin.y + dy,
-    )
-    print(f"{state.selected.ref} moved to {state.selected.origin}")
+    _apply_to_selection(state, Transform.translate(dx, dy), f"moved by ({dx},{dy}):")
+    return True
+
+
+def cmd_rotate(state: CLIState, parts: list[str]) -> bool:
+    if not state.selected:
+        print("no component selected")
+        return True
+    if len(parts) != 2 or parts[1] not in ("90", "180", "270"):
+        print("usage: rotate <90|180|270>")
+        return True
+
+    min_x, min_y, max_x, max_y = selection_bounds(state.selected)
+    center = Coord((min_x + max_x) // 2, (min_y + max_y) // 2)
+    _apply_to_selection(state, Transform.rotate(int(parts[1]), center), f"rotated by {parts[1]}:")
     return True
 
 
+def cmd_mirror(state: CLIState, parts: list[str]) -> bool:
+    if not state.selected:
+        print("no component selected")
+        return True
+
+    min_x, _, max_x, _ = selection_bounds(state.selected)
+    _apply_to_selection(state, Transform.mirror_x(min_x + max_x), "mirrored:")
+    return True
+
+
+# Перерисовка после изменения платы: только board.svg, аргументы
+# команды, которая её вызвала, сюда не передаются
+_RERENDER = ["render"]
+
+
 def cmd_render(state: CLIState, parts: list[str]) -> bool:
-    errors = check_placement(state.grid, state.components)
-    errors.extend(check_jumpers(state.grid, state.jumpers))
-    errors.extend(check_traces(state.grid, state.traces))
-    for e in errors:
+    both = parts[1:] == ["both"]
+    if len(parts) > 1 and not both:
+        print("usage: render [both]")
+        return True
+
+    state.errors = run_drc(state.grid, state.components, state.jumpers, state.traces)
+    for e in state.errors:
         print(e)
-    render_svg(state.grid, state.components, errors, state.jumpers, state.traces, flip=state.flip)
-    print("board.svg updated")
+    _redraw(state, both)
+    return True
+
+
+def _redraw(state: CLIState, both: bool = False) -> None:
+    """board.svg (and with `both` the two sides) from state.errors, without DRC."""
+    from ratsnest import ratsnest
+    from render_svg import build_scene, write_scene
+
+    lines = ratsnest(state.grid, state.components, state.jumpers, state.traces)
+    if lines:
+        print(f"{len(lines)} unrouted connection(s)")
+    state.scene = build_scene(
+        state.grid, state.components, state.errors, state.jumpers, state.traces, ratsnest=lines
+    )
+    write_scene(state.scene, "board.svg", state.flip)
+    if both:
+        write_scene(state.scene, "board_front.svg", False)
+        write_scene(state.scene, "board_back.svg", True)
+        print("board.svg, board_front.svg, board_back.svg updated")
+    else:
+        print("board.svg updated")
+
+
+def _render_after_move(state: CLIState) -> None:
+    # _apply_to_selection уже поправил state.errors — полный DRC не нужен
+    if state.errors is None:
+        cmd_render(state, _RERENDER)
+    else:
+        _redraw(state)
+
+
+def cmd_render_tiles(state: CLIState, parts: list[str]) -> bool:
+    if len(parts) > 2:
+        print("usage: render-tiles [dir]")
+        return True
+    out_dir = parts[1] if len(parts) == 2 else "board_tiles"
+
+    from render_tiles import render_tiles
+
+    errors = run_drc(state.grid, state.components, state.jumpers, state.traces)
+    written = render_tiles(
+        state.grid, state.components, errors, state.jumpers, state.traces, out_dir=out_dir
+    )
+    print(f"{out_dir}/index.html updated ({written} tile(s) rendered)")
     return True
 
 
@@ -105,52 +309,185 @@ def cmd_flip(state: CLIState, parts: list[str]) -> bool:
     state.flip = not state.flip
     mode = "back" if state.flip else "front"
     print(f"view mode: {mode} side")
-    cmd_render(state, parts)
+    if state.scene is None:
+        cmd_render(state, _RERENDER)
+        return True
+
+    # Плата не менялась с последнего render: DRC не нужен, только другая сторона
+    from render_svg import write_scene
+
+    write_scene(state.scene, "board.svg", state.flip)
+    print("board.svg updated")
     return True
 
 
 def cmd_save(state: CLIState, parts: list[str]) -> bool:
-    save_board(BOARD_PATH, state.board_data, state.components, state.jumpers, state.traces)
+    if not state.dirty:
+        print("no changes, board.yaml not written")
+        return True
+
+    from io_board import save_board
+    save_board(
+        BOARD_PATH, state.grid, state.components, state.jumpers, state.traces,
+        dirty=state.dirty, cache=state.save_cache, sections=state.sections,
+    )
+    state.dirty.clear()
     print("board.yaml saved")
     return True
 
 
+def cmd_clearance(state: CLIState, parts: list[str]) -> bool:
+    if len(parts) == 1:
+        print(f"min clearance: {state.grid.min_clearance}")
+        return True
+    if len(parts) != 2:
+        print("usage: clearance [n]")
+        return True
+    try:
+        n = int(parts[1])
+    except ValueError:
+        print("n must be an integer")
+        return True
+    if n < 0:
+        print("n must be >= 0")
+        return True
+
+    state.grid = replace(state.grid, min_clearance=n)
+    state.dirty.add(("section", "grid"))
+    print(f"min clearance set to {n}")
+    return True
+
+
+def cmd_strip_cuts(state: CLIState, parts: list[str]) -> bool:
+    if state.grid.kind != "stripboard":
+        print("not a stripboard")
+        return True
+    from stripboard import propose_cuts
+
+    cuts, problems = propose_cuts(state.grid, state.components, state.jumpers, state.traces)
+    for p in problems:
+        print(p)
+    if not cuts:
+        print("no cuts needed")
+        return True
+    print(f"{len(cuts)} cut(s) needed:")
+    for c in cuts:
+        print(f"  cut at ({c.x},{c.y})")
+    return True
+
+
+def cmd_net(state: CLIState, parts: list[str]) -> bool:
+    if len(parts) not in (3, 4):
+        print("usage: net <ref> <pin> [net]")
+        return True
+    ref, pin = parts[1], parts[2]
+    comp = next((c for c in state.components if c.ref == ref), None)
+    if comp is None:
+        print(f"component '{ref}' not found")
+        return True
+    if all(p.name != pin for p in comp.footprint.pins):
+        print(f"{ref} has no pin '{pin}'")
+        return True
+
+    if len(parts) == 4:
+        comp.nets[pin] = parts[3]
+        print(f"{ref}.{pin} -> {parts[3]}")
+    else:
+        comp.nets.pop(pin, None)
+        print(f"{ref}.{pin} net cleared")
+    state.dirty.add(("component", ref))
+    return True
+
+
+def cmd_ratsnest(state: CLIState, parts: list[str]) -> bool:
+    from ratsnest import ratsnest
+
+    lines = ratsnest(state.grid, state.components, state.jumpers, state.traces)
+    if not lines:
+        print("everything is routed")
+        return True
+    for net, a, b in lines:
+        print(f"{net}: ({a.x},{a.y}) -> ({b.x},{b.y})")
+    return True
+
+
 def cmd_jumper_list(state: CLIState, parts: list[str]) -> bool:
     if not state.jumpers:
         print("no jumpers")
         return True
     for j in state.jumpers:
-        print(f"{j.jid} {j.net}: {j.a} -> {j.b}")
+        a = _point_text(j.a, j.anchors.get("a"))
+        b = _point_text(j.b, j.anchors.get("b"))
+        print(f"{j.jid} {j.net}: {a} -> {b}")
     return True
 
 
+def _point_text(p: Coord, anchor: tuple[str, str] | None) -> str:
+    if anchor:
+        return f"{anchor[0]}.{anchor[1]}({p.x},{p.y})"
+    return f"({p.x},{p.y})"
+
+
+def _parse_points(state: CLIState, args: list[str], limit: int | None = None):
+    """Points given as `<x> <y>` or `<ref>.<pin>`, up to `limit` of them:
+    (coords, anchors, rest of args), None on error."""
+    coords: list[Coord] = []
+    anchors: dict[int, tuple[str, str]] = {}
+    i = 0
+    while i < len(args) and len(coords) != limit:
+        ref, dot, pin = args[i].rpartition(".")
+        if dot:
+            comp = next((c for c in state.components if c.ref == ref), None)
+            coord = comp.pin_position(pin) if comp is not None else None
+            if coord is None:
+                print(f"unknown pin '{args[i]}'")
+                return None
+            anchors[len(coords)] = (ref, pin)
+            coords.append(coord)
+            i += 1
+            continue
+        try:
+            coords.append(Coord(int(args[i]), int(args[i + 1])))
+        except (ValueError, IndexError):
+            print("point must be <x> <y> or <ref>.<pin>")
+            return None
+        i += 2
+    return coords, anchors, args[i:]
+
+
 def cmd_jumper_add(state: CLIState, parts: list[str]) -> bool:
-    if len(parts) not in (7, 8):
-        print("usage: jumper-add <id> <net> <x1> <y1> <x2> <y2> [color]")
+    usage = "usage: jumper-add <id> <net> <a> <b> [color]  (point: <x> <y> or <ref>.<pin>)"
+    if len(parts) < 5:
+        print(usage)
         return True
     jid = parts[1]
     if any(j.jid == jid for j in state.jumpers):
         print(f"jumper '{jid}' already exists")
         return True
     net = parts[2]
-    try:
-        x1 = int(parts[3])
-        y1 = int(parts[4])
-        x2 = int(parts[5])
-        y2 = int(parts[6])
-    except ValueError:
-        print("x/y must be integers")
+    parsed = _parse_points(state, parts[3:], limit=2)
+    if parsed is None:
+        return True
+    coords, anchors, rest = parsed
+    if len(coords) != 2 or len(rest) > 1:
+        print(usage)
         return True
 
-    if len(parts) == 8:
-        color = parts[7]
+    if rest:
+        color = rest[0]
     else:
         r = random.randint(64, 255)
         g = random.randint(64, 255)
         b = random.randint(64, 255)
         color = f"#{r:02x}{g:02x}{b:02x}"
-    jumper = Jumper(jid=jid, net=net, a=Coord(x1, y1), b=Coord(x2, y2), color=color)
+    jumper = Jumper(
+        jid=jid, net=net, a=coords[0], b=coords[1], color=color,
+        anchors={"ab"[i]: a for i, a in anchors.items()},
+    )
     state.jumpers.append(jumper)
+    if state.wiring is not None:
+        state.wiring.add(jumper)
+    state.dirty.add(("jumper", jid))
     print(f"jumper {jid} added")
     return True
 
@@ -160,11 +497,15 @@ def cmd_jumper_del(state: CLIState, parts: list[str]) -> bool:
         print("usage: jumper-del <id>")
         return True
     jid = parts[1]
-    before = len(state.jumpers)
+    gone = [j for j in state.jumpers if j.jid == jid]
     state.jumpers = [j for j in state.jumpers if j.jid != jid]
-    if len(state.jumpers) == before:
+    if not gone:
         print(f"jumper '{jid}' not found")
     else:
+        if state.wiring is not None:
+            for j in gone:
+                state.wiring.remove(j)
+        state.dirty.add(("jumper", jid))
         print(f"jumper {jid} deleted")
     return True
 
@@ -174,33 +515,32 @@ def cmd_trace_list(state: CLIState, parts: list[str]) -> bool:
         print("no traces")
         return True
     for t in state.traces:
-        pts = " ".join(f"({p.x},{p.y})" for p in t.points)
+        pts = " ".join(_point_text(p, t.anchors.get(i)) for i, p in enumerate(t.points))
         print(f"{t.tid} {t.net}: {pts}")
     return True
 
 
 def cmd_trace_add(state: CLIState, parts: list[str]) -> bool:
-    if len(parts) < 7 or (len(parts) - 3) % 2 != 0:
-        print("usage: trace-add <id> <net> <x1> <y1> <x2> <y2> [<x3> <y3> ...]")
+    if len(parts) < 5:
+        print("usage: trace-add <id> <net> <p1> <p2> [<p3> ...]  (point: <x> <y> or <ref>.<pin>)")
         return True
     tid = parts[1]
     if any(t.tid == tid for t in state.traces):
         print(f"trace '{tid}' already exists")
         return True
     net = parts[2]
-    coords: list[Coord] = []
-    try:
-        for i in range(3, len(parts), 2):
-            x = int(parts[i])
-            y = int(parts[i + 1])
-            coords.append(Coord(x, y))
-    except ValueError:
-        print("x/y must be integers")
+    parsed = _parse_points(state, parts[3:])
+    if parsed is None:
         return True
+    coords, anchors, _ = parsed
     if len(coords) < 2:
         print("trace must have at least 2 points")
         return True
-    state.traces.append(Trace(tid=tid, net=net, points=coords))
+    trace = Trace(tid=tid, net=net, points=coords, anchors=anchors)
+    state.traces.append(trace)
+    if state.wiring is not None:
+        state.wiring.add(trace)
+    state.dirty.add(("trace", tid))
     print(f"trace {tid} added")
     return True
 
@@ -210,11 +550,15 @@ def cmd_trace_del(state: CLIState, parts: list[str]) -> bool:
         print("usage: trace-del <id>")
         return True
     tid = parts[1]
-    before = len(state.traces)
+    gone = [t for t in state.traces if t.tid == tid]
     state.traces = [t for t in state.traces if t.tid != tid]
-    if len(state.traces) == before:
+    if not gone:
         print(f"trace '{tid}' not found")
     else:
+        if state.wiring is not None:
+            for t in gone:
+                state.wiring.remove(t)
+        state.dirty.add(("trace", tid))
         print(f"trace {tid} deleted")
     return True
 
@@ -225,31 +569,19 @@ def cmd_quit(state: CLIState, parts: list[str]) -> bool:
 
 def run():
     footprints = load_footprints(FOOTPRINTS_PATH)
-    board_data, grid, components, jumpers, traces = load_board(BOARD_PATH, footprints)
+    sections: dict = {}
+    grid, components, jumpers, traces = load_board(BOARD_PATH, footprints, sections)
     state = CLIState(
-        board_data=board_data,
         grid=grid,
         components=components,
         jumpers=jumpers,
         traces=traces,
+        sections=sections,
     )
 
     print("ProtoBoard CLI")
     print("Type 'help' for commands")
-    print("Commands:")
-    print("  list                 - list components")
-    print("  select <ref>         - select component")
-    print("  move <dx> <dy>       - move selected component")
-    print("  render               - render board.svg")
-    print("  flip                 - toggle board flip (view only)")
-    print("  save                 - save board.yaml")
-    print("  jumper-list          - list jumpers")
-    print("  jumper-add <id> <net> <x1> <y1> <x2> <y2> [color]")
-    print("  jumper-del <id>")
-    print("  trace-list           - list traces")
-    print("  trace-add <id> <net> <x1> <y1> <x2> <y2> [<x3> <y3> ...]")
-    print("  trace-del <id>")
-    print("  quit                 - exit")
+    cmd_help(state, [])
 
     while True:
         try:
@@ -270,31 +602,56 @@ def run():
             cmd_list(state, parts)
         elif name == "select":
             cmd_select(state, parts)
+        elif name == "select-net":
+            cmd_select_net(state, parts)
+        elif name == "select-rect":
+            cmd_select_rect(state, parts)
+        elif name == "select-none":
+            cmd_select_none(state, parts)
         elif name == "move":
             cmd_move(state, parts)
-            cmd_render(state, parts)
+            _render_after_move(state)
+        elif name == "rotate":
+            cmd_rotate(state, parts)
+            _render_after_move(state)
+        elif name == "mirror":
+            cmd_mirror(state, parts)
+            _render_after_move(state)
         elif name == "render":
             cmd_render(state, parts)
+        elif name == "render-tiles":
+            cmd_render_tiles(state, parts)
         elif name == "flip":
             cmd_flip(state, parts)
         elif name == "save":
             cmd_save(state, parts)
+        elif name == "clearance":
+            cmd_clearance(state, parts)
+            if len(parts) > 1:
+                cmd_render(state, _RERENDER)
+        elif name == "strip-cuts":
+            cmd_strip_cuts(state, parts)
+        elif name == "net":
+            cmd_net(state, parts)
+            cmd_render(state, _RERENDER)
+        elif name == "ratsnest":
+            cmd_ratsnest(state, parts)
         elif name == "jumper-list":
             cmd_jumper_list(state, parts)
         elif name == "jumper-add":
             cmd_jumper_add(state, parts)
-            cmd_render(state, parts)
+            cmd_render(state, _RERENDER)
         elif name == "jumper-del":
             cmd_jumper_del(state, parts)
-            cmd_render(state, parts)
+            cmd_render(state, _RERENDER)
         elif name == "trace-list":
             cmd_trace_list(state, parts)
         elif name == "trace-add":
             cmd_trace_add(state, parts)
-            cmd_render(state, parts)
+            cmd_render(state, _RERENDER)
         elif name == "trace-del":
             cmd_trace_del(state, parts)
-            cmd_render(state, parts)
+            cmd_render(state, _RERENDER)
         elif name in ("quit", "exit", "q"):
             cmd_quit(state, parts)
             print("bye")
@@ -0,0 +1,2 @@
+# Модули проекта лежат в корне репозитория: pytest добавляет его в sys.path
+# из-за этого файла, тесты импортируют их как обычно.
@@ -0,0 +1,345 @@
+import os
+from array import array
+from math import isqrt
+
+from model import Coord, ComponentInstance, Jumper, Trace
+from grid import (
+    Grid,
+    check_placement,
+    check_jumpers,
+    check_traces,
+    check_clearance,
+    find_clearance_violations,
+    format_clearance_violation,
+    net_cells,
+    pin_parts,
+    trace_cells,
+    violation_key,
+)
+from stripboard import check_strips
+
+
+# Ниже этого числа клеток пул процессов дороже самой проверки
+PARALLEL_MIN_CELLS = 1_000_000
+MIN_TILE = 64
+
+
+def check_board(
+    grid: Grid,
+    components: list[ComponentInstance],
+    jumpers: list[Jumper],
+    traces: list[Trace],
+) -> list[str]:
+    """All DRC passes, serially, in the order they are reported."""
+    errors = check_placement(grid, components)
+    errors.extend(check_jumpers(grid, jumpers))
+    errors.extend(check_traces(grid, traces))
+    errors.extend(check_clearance(grid, components, jumpers, traces))
+    errors.extend(check_strips(grid, components, jumpers, traces))
+    return errors
+
+
+def covered_cells(
+    components: list[ComponentInstance],
+    jumpers: list[Jumper],
+    traces: list[Trace],
+) -> set[Coord]:
+    """Pins, trace cells and jumper ends of these objects."""
+    cells = {p for c in components for p in c.placed_pins()}
+    for t in traces:
+        cells.update(trace_cells(t))
+    for j in jumpers:
+        cells.update((j.a, j.b))
+    return cells
+
+
+def _near(cells: set[Coord], radius: int) -> set[tuple[int, int]]:
+    """(x, y) of every cell within Chebyshev `radius` of `cells`."""
+    return {
+        (c.x + dx, c.y + dy)
+        for c in cells
+        for dx in range(-radius, radius + 1)
+        for dy in range(-radius, radius + 1)
+    }
+
+
+def check_region(
+    grid: Grid,
+    components: list[ComponentInstance],
+    jumpers: list[Jumper],
+    traces: list[Trace],
+    cells: set[Coord],
+    moved_jumpers: list[Jumper],
+    moved_traces: list[Trace],
+) -> list[str]:
+    """The errors of check_board that can change when only objects on `cells` move.
+
+    `cells` must hold every cell the moved objects cover, before and after
+    the move. Run it on the board before and after: removing the first
+    result from the last full check_board and adding the second gives the
+    new full result, without a pass over the whole board. Pin conflicts are
+    checked at `cells`, wiring checks cover the moved wiring, and clearance
+    is checked near `cells` only. Strip shorts connect whole strips, so on
+    a stripboard they are checked in full.
+    """
+    clearance = grid.min_clearance
+    # check_placement, но только по клеткам из cells
+    errors: list[str] = []
+    occupied: dict[Coord, str] = {}
+    for comp in components:
+        for pin in comp.placed_pins():
+            if pin not in cells:
+                continue
+            if not grid.contains(pin):
+                errors.append(f"{comp.ref}: pin outside grid at {pin}")
+            elif pin in occupied:
+                errors.append(f"conflict at {pin}: {comp.ref} overlaps {occupied[pin]}")
+            else:
+                occupied[pin] = comp.ref
+    errors.extend(check_jumpers(grid, moved_jumpers))
+    errors.extend(check_traces(grid, moved_traces))
+
+    # Нарушение с концом в пределах clearance от cells видят только клетки
+    # в пределах 2*clearance; им нужны источники в пределах 3*clearance.
+    # Всё, что дальше, от сдвига не меняется.
+    near = _near(cells, clearance)
+    report = _near(cells, 2 * clearance)
+    reach = _near(cells, 3 * clearance)
+    sources = {
+        net: {c for c in cs if (c.x, c.y) in reach}
+        for net, cs in net_cells(jumpers, traces, components).items()
+    }
+    parts = {p: ref for p, ref in pin_parts(components).items() if p in reach}
+    violations = find_clearance_violations(
+        {net: cs for net, cs in sources.items() if cs},
+        clearance,
+        cells={Coord(x, y) for x, y in report},
+        parts=parts,
+    )
+    errors.extend(
+        format_clearance_violation(v, clearance)
+        for v in violations
+        if (v.a.x, v.a.y) in near or (v.b.x, v.b.y) in near
+    )
+    errors.extend(check_strips(grid, components, jumpers, traces))
+    return errors
+
+
+def run_drc(
+    grid: Grid,
+    components: list[ComponentInstance],
+    jumpers: list[Jumper],
+    traces: list[Trace],
+    workers: int | None = None,
+    tile_size: int | None = None,
+) -> list[str]:
+    """Same result as check_board, with the work done in a process pool.
+
+    The parent writes components, traces and jumpers once as compact int32
+    arrays to a read-only memory-mapped file (see snapshot.py); workers get
+    only its path and the bounds of their slice. First the objects are
+    split into chunks: workers place pins, check traces (every trace check
+    concerns one trace) and sort pins and net cells into square tiles. The
+    parent only concatenates the per-tile arrays and publishes them in a
+    second snapshot. Then every tile is checked for pin conflicts (which
+    happen at one cell) and for clearance, reading the net cells within
+    min_clearance around it from the snapshot. Every error carries the
+    position it has in the serial run and the merged list is sorted by it,
+    so the output does not depend on scheduling.
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers <= 1 or (tile_size is None and grid.width * grid.height < PARALLEL_MIN_CELLS):
+        return check_board(grid, components, jumpers, traces)
+
+    if tile_size is None:
+        # ~4 тайла на процесс, чтобы выровнять нагрузку
+        tile_size = max(MIN_TILE, isqrt(grid.width * grid.height // (4 * workers)) + 1)
+
+    nets = sorted(
+        {n for c in components for n in c.nets.values()}
+        | {j.net for j in jumpers}
+        | {t.net for t in traces}
+    )
+    net_ids = {n: i for i, n in enumerate(nets)}
+
+    from concurrent.futures import ProcessPoolExecutor
+    from snapshot import publish, publish_objects
+
+    placement_errors: list[tuple[tuple, str]] = []
+    trace_errors: list[str] = []
+    tiles: dict[tuple[int, int], list[array]] = {}
+    violations: dict[tuple, str] = {}
+    # В воркеры уходят только путь к снимку и границы куска — не сама доска
+    with (
+        publish_objects(components, jumpers, traces, net_ids) as objs,
+        ProcessPoolExecutor(max_workers=workers) as pool,
+    ):
+        shape = (grid.width, grid.height, grid.min_clearance, tile_size)
+        jobs = []
+        for kind, items in (("component", components), ("trace", traces), ("jumper", jumpers)):
+            step = max(1, -(-len(items) // (4 * workers)))
+            jobs.extend(
+                (objs.path, kind, lo, min(lo + step, len(items))) + shape
+                for lo in range(0, len(items), step)
+            )
+        for kind, errors, buckets in pool.map(_split_chunk, jobs):
+            if kind == "component":
+                placement_errors.extend(errors)
+            elif kind == "trace":
+                trace_errors.extend(errors)
+            for key, arrays in buckets.items():
+                t = tiles.get(key)
+                if t is None:
+                    tiles[key] = arrays
+                else:
+                    for mine, more in zip(t, arrays):
+                        mine.extend(more)
+
+        with publish(tile_size, tiles) as snap:
+            jobs = [(key, snap.path, objs.path, grid.min_clearance) for key in sorted(tiles)]
+            for p_err, viol in pool.map(_check_tile, jobs, chunksize=1):
+                placement_errors.extend(p_err)
+                violations.update(viol)
+
+    placement_errors.sort(key=lambda e: e[0])
+
+    errors = [msg for _, msg in placement_errors]
+    errors.extend(check_jumpers(grid, jumpers))
+    errors.extend(trace_errors)
+    # одно нарушение могут найти два соседних тайла — ключ одинаковый
+    errors.extend(violations[k] for k in sorted(violations))
+    errors.extend(check_strips(grid, components, jumpers, traces))
+    return errors
+
+
+# ---------- workers ----------
+
+# Снимки, открытые в этом процессе-воркере: по одному на все его задачи
+_SNAPSHOTS: dict[str, object] = {}
+
+
+def _snapshot(path: str, cls):
+    snap = _SNAPSHOTS.get(path)
+    if snap is None:
+        # файлы прошлого прогона уже удалены, их отображения не нужны
+        for old in list(_SNAPSHOTS):
+            if not os.path.exists(old):
+                _SNAPSHOTS.pop(old).close()
+        snap = _SNAPSHOTS[path] = cls(path)
+    return snap
+
+
+def _split_chunk(job: tuple):
+    """Per-object work for objects lo..hi of one kind.
+
+    Returns the errors found and, per tile, int32 arrays in the order of
+    snapshot.SECTIONS: net cells (x, y, net), pins with a net (x, y,
+    component), both again for those within min_clearance of the tile
+    edge (all that neighbouring tiles read), and all pins on the grid
+    (component, pin, x, y).
+    """
+    from snapshot import BoardObjects
+
+    path, kind, lo, hi, width, height, clearance, size = job
+    objs = _snapshot(path, BoardObjects)
+    grid = Grid(width, height)
+    buckets: dict[tuple[int, int], list[array]] = {}
+
+    def bucket(x: int, y: int) -> list[array]:
+        key = (x // size, y // size)
+        b = buckets.get(key)
+        if b is None:
+            b = buckets[key] = [array("i") for _ in range(5)]
+        return b
+
+    def near_edge(x: int, y: int) -> bool:
+        dx = x % size
+        dy = y % size
+        return min(dx, dy, size - 1 - dx, size - 1 - dy) < clearance
+
+    def cell(x: int, y: int, net: int) -> list[array]:
+        b = bucket(x, y)
+        b[0].extend((x, y, net))
+        if near_edge(x, y):
+            b[2].extend((x, y, net))
+        return b
+
+    errors: list = []
+    if kind == "component":
+        footprints, offsets, comp_nets = objs.footprints, objs.offsets, objs.comp_nets
+        for ci in range(lo, hi):
+            fp, ox, oy, rotation, start, n = objs.components[6 * ci: 6 * ci + 6]
+            first, count = footprints[2 * fp: 2 * fp + 2]
+            it = iter(comp_nets[2 * start: 2 * (start + n)])
+            nets = dict(zip(it, it))
+            for pi in range(count):
+                k = 2 * (first + pi)
+                d = Coord(offsets[k], offsets[k + 1]).rotate(rotation)
+                p = Coord(ox + d.x, oy + d.y)
+                on_grid = grid.contains(p)
+                if not on_grid:
+                    errors.append(((ci, pi), f"{objs.refs[ci]}: pin outside grid at {p}"))
+                net = nets.get(pi)
+                if net is not None:
+                    b = cell(p.x, p.y, net)
+                    b[1].extend((p.x, p.y, ci))
+                    if near_edge(p.x, p.y):
+                        b[3].extend((p.x, p.y, ci))
+                    if on_grid:
+                        b[4].extend((ci, pi, p.x, p.y))
+                elif on_grid:
+                    bucket(p.x, p.y)[4].extend((ci, pi, p.x, p.y))
+    elif kind == "trace":
+        points = objs.points
+        chunk: list[tuple[int, Trace]] = []
+        for ti in range(lo, hi):
+            net, start, n = objs.traces[3 * ti: 3 * ti + 3]
+            it = iter(points[2 * start: 2 * (start + n)])
+            t = Trace(objs.tids[ti], objs.nets[net], [Coord(x, y) for x, y in zip(it, it)])
+            chunk.append((net, t))
+        errors = check_traces(grid, [t for _, t in chunk])
+        for net, t in chunk:
+            for c in trace_cells(t):
+                cell(c.x, c.y, net)
+    else:
+        it = iter(objs.jumpers[5 * lo: 5 * hi])
+        for net, ax, ay, bx, by in zip(it, it, it, it, it):
+            cell(ax, ay, net)
+            cell(bx, by, net)
+
+    return kind, errors, buckets
+
+
+def _check_tile(job: tuple[tuple[int, int], str, str, int]):
+    from snapshot import BoardObjects, BoardSnapshot
+
+    key, path, objs_path, clearance = job
+    snap = _snapshot(path, BoardSnapshot)
+    objs = _snapshot(objs_path, BoardObjects)
+    refs = objs.refs
+
+    placement: list[tuple[tuple, str]] = []
+    occupied: dict[tuple[int, int], int] = {}
+    # пины в порядке (деталь, пин), как их обходит check_placement
+    it = iter(snap.tile(key, "pins"))
+    for ci, pi, x, y in zip(it, it, it, it):
+        first = occupied.get((x, y))
+        if first is None:
+            occupied[(x, y)] = ci
+        else:
+            placement.append((
+                (ci, pi),
+                f"conflict at {Coord(x, y)}: {refs[ci]} overlaps {refs[first]}",
+            ))
+
+    violations = []
+    sources, parts, core = snap.window(key, clearance, objs.nets, refs)
+    if sources:
+        # сообщения собираем здесь же: родителю остаётся только сортировка
+        violations = [
+            (violation_key(v) + (v.distance,), format_clearance_violation(v, clearance))
+            for v in find_clearance_violations(sources, clearance, cells=core, parts=parts)
+        ]
+
+    return placement, violations
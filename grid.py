@@ -1,10 +1,16 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from model import Coord, ComponentInstance, Jumper, Trace
 
 @dataclass(frozen=True)
 class Grid:
     width: int
     height: int
+    min_clearance: int = 0  # минимум свободных отверстий между разными цепями
+    kind: str = "perfboard"  # "perfboard" | "stripboard"
+    tracks: str = "x"  # stripboard: вдоль какой оси идут полоски
+    cuts: frozenset[Coord] = frozenset()  # stripboard: разрезы полосок
+    # неизвестные ключи секции grid, для save; в сравнение и hash не входят
+    extra: dict = field(default_factory=dict, compare=False)
 
     def contains(self, coord: Coord) -> bool:
         return (
@@ -93,3 +99,211 @@ def check_traces(grid: Grid, traces: list[Trace]) -> list[str]:
             prev = nxt
 
     return errors
+
+
+# ---------- clearance ----------
+
+# 8-связность: соседние по диагонали отверстия тоже легко замкнуть припоем
+_NEIGHBOURS = tuple(
+    (dx, dy) for dy in (-1, 0, 1) for dx in (-1, 0, 1) if dx or dy
+)
+
+
+@dataclass(frozen=True)
+class ClearanceViolation:
+    net_a: str
+    a: Coord
+    net_b: str
+    b: Coord
+    distance: int  # Chebyshev distance in holes, 0 = same hole
+
+
+def trace_cells(trace: Trace) -> list[Coord]:
+    """All cells covered by the orthogonal segments of a trace."""
+    if not trace.points:
+        return []
+    cells = [trace.points[0]]
+    prev = trace.points[0]
+    for nxt in trace.points[1:]:
+        dx = nxt.x - prev.x
+        dy = nxt.y - prev.y
+        if dx != 0 and dy != 0:
+            # non-orthogonal segment is reported by check_traces
+            cells.append(nxt)
+            prev = nxt
+            continue
+        step_x = 0 if dx == 0 else (1 if dx > 0 else -1)
+        step_y = 0 if dy == 0 else (1 if dy > 0 else -1)
+        for i in range(1, abs(dx) + abs(dy) + 1):
+            cells.append(Coord(prev.x + i * step_x, prev.y + i * step_y))
+        prev = nxt
+    return cells
+
+
+def net_cells(
+    jumpers: list[Jumper],
+    traces: list[Trace],
+    components: list[ComponentInstance] = (),
+) -> dict[str, set[Coord]]:
+    cells: dict[str, set[Coord]] = {}
+    for comp in components:
+        for coord, net in comp.pin_nets():
+            cells.setdefault(net, set()).add(coord)
+    for t in traces:
+        cells.setdefault(t.net, set()).update(trace_cells(t))
+    for j in jumpers:
+        cells.setdefault(j.net, set()).update((j.a, j.b))
+    return cells
+
+
+def distance_field(
+    sources: dict[str, set[Coord]],
+    radius: int,
+) -> dict[tuple[int, int], dict[str, int]]:
+    """Per-net Chebyshev distance to the nearest source cell, up to `radius`.
+
+    All nets are expanded together, layer by layer, in a single multi-source
+    BFS; a cell only keeps the nets whose front actually reached it. Cells
+    are plain (x, y) tuples here: hashing them is several times cheaper than
+    hashing Coord, and this is the hot loop of the clearance check.
+    """
+    field: dict[tuple[int, int], dict[str, int]] = {}
+    frontier: list[tuple[int, int, str]] = []
+    for net, cells in sources.items():
+        for c in cells:
+            nets = field.get((c.x, c.y))
+            if nets is None:
+                field[(c.x, c.y)] = {net: 0}
+            else:
+                nets[net] = 0
+            frontier.append((c.x, c.y, net))
+
+    for d in range(1, radius + 1):
+        nxt: list[tuple[int, int, str]] = []
+        for x, y, net in frontier:
+            for dx, dy in _NEIGHBOURS:
+                n = (x + dx, y + dy)
+                nets = field.get(n)
+                if nets is None:
+                    field[n] = {net: d}
+                elif net not in nets:
+                    nets[net] = d
+                else:
+                    continue
+                nxt.append((n[0], n[1], net))
+        frontier = nxt
+
+    return field
+
+
+def _nearest_on_ring(
+    x0: int,
+    y0: int,
+    d: int,
+    cells: set[tuple[int, int]],
+    part: str | None = None,
+    parts: dict[tuple[int, int], str] | None = None,
+) -> tuple[int, int] | None:
+    """Closest (manhattan, then y, x) member of `cells` at Chebyshev distance d.
+
+    Cells that are pins of `part` (per `parts`) don't count.
+    """
+    best = None
+    best_key = None
+    for y in range(y0 - d, y0 + d + 1):
+        edge = y == y0 - d or y == y0 + d
+        xs = range(x0 - d, x0 + d + 1) if edge else (x0 - d, x0 + d)
+        for x in xs:
+            if (x, y) not in cells:
+                continue
+            if part is not None and parts.get((x, y)) == part:
+                continue
+            key = (abs(x - x0) + abs(y - y0), y, x)
+            if best_key is None or key < best_key:
+                best, best_key = (x, y), key
+    return best
+
+
+def find_clearance_violations(
+    sources: dict[str, set[Coord]],
+    min_clearance: int,
+    cells: set[Coord] | None = None,
+    parts: dict[tuple[int, int], str] | None = None,
+) -> list[ClearanceViolation]:
+    """Pairs of cells of different nets closer than `min_clearance` free holes.
+
+    Only cells in `cells` (all source cells by default) are checked on the
+    reporting side; the result is sorted, so it doesn't depend on input order.
+    `parts` maps pin cells to their component: two pins of the same part are
+    as close as the footprint puts them, so such pairs are not reported.
+    """
+    parts = parts or {}
+    field = distance_field(sources, min_clearance)
+    points = {net: {(c.x, c.y) for c in cs} for net, cs in sources.items()}
+    found: set[ClearanceViolation] = set()
+
+    for net_b, cells_b in sources.items():
+        for b in cells_b:
+            nets = field[(b.x, b.y)]
+            if len(nets) < 2 or (cells is not None and b not in cells):
+                continue
+            part = parts.get((b.x, b.y))
+            for net_a, d in nets.items():
+                if net_a == net_b:
+                    continue
+                near = None
+                # ближайшая клетка может оказаться пином той же детали —
+                # тогда ищем дальше, в пределах min_clearance
+                while near is None and d <= min_clearance:
+                    # в одной клетке два пина одной детали не бывают
+                    near = _nearest_on_ring(
+                        b.x, b.y, d, points[net_a], part if d else None, parts
+                    )
+                    d += 1
+                if near is None:
+                    continue
+                d -= 1
+                ax, ay = near
+                a = Coord(ax, ay)
+                if (net_a, ay, ax) > (net_b, b.y, b.x):
+                    found.add(ClearanceViolation(net_b, b, net_a, a, d))
+                else:
+                    found.add(ClearanceViolation(net_a, a, net_b, b, d))
+
+    return sorted(found, key=violation_key)
+
+
+def violation_key(v: ClearanceViolation) -> tuple:
+    return (v.net_a, v.net_b, v.a.y, v.a.x, v.b.y, v.b.x)
+
+
+def format_clearance_violation(v: ClearanceViolation, min_clearance: int) -> str:
+    if v.distance == 0:
+        return f"short {v.net_a}/{v.net_b} at {v.a}"
+    return (
+        f"clearance {v.net_a}/{v.net_b}: {v.a} to {v.b} "
+        f"gap {v.distance - 1} < {min_clearance}"
+    )
+
+
+def pin_parts(components: list[ComponentInstance]) -> dict[tuple[int, int], str]:
+    """(x, y) of every pin with a net -> ref of its component."""
+    return {
+        (coord.x, coord.y): comp.ref
+        for comp in components
+        for coord, _ in comp.pin_nets()
+    }
+
+
+def check_clearance(
+    grid: Grid,
+    components: list[ComponentInstance],
+    jumpers: list[Jumper],
+    traces: list[Trace],
+) -> list[str]:
+    violations = find_clearance_violations(
+        net_cells(jumpers, traces, components),
+        grid.min_clearance,
+        parts=pin_parts(components),
+    )
+    return [format_clearance_violation(v, grid.min_clearance) for v in violations]
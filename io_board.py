@@ -1,141 +1,460 @@
-import random
+import os
 import yaml
+from dataclasses import dataclass, field
 from typing import Mapping
 
 from model import Coord, ComponentInstance, Footprint, Jumper, Trace
 from grid import Grid
 
+# libyaml-парсер в разы быстрее чистого Python, если PyYAML собран с ним
+_Loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+_Dumper = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+
+
+# Поля, которые понимает модель. Остальные ключи не ошибка: они лежат
+# в extra объекта как есть и пишутся обратно при save.
+_GRID_FIELDS = {"width", "height", "min_clearance", "type", "tracks", "cuts"}
+_COMPONENT_FIELDS = {"ref", "footprint", "x", "y", "rotation", "bbox", "nets"}
+_JUMPER_FIELDS = {"id", "net", "a", "b", "color"}
+_TRACE_FIELDS = {"id", "net", "points"}
+
+
+def _extra_fields(data: dict, known: set[str]) -> dict:
+    return {key: value for key, value in data.items() if key not in known}
 
-def load_board(path: str, footprints: Mapping[str, Footprint]):
-    with open(path, "r", encoding="utf-8") as f:
-        board_data = yaml.safe_load(f)
 
-    grid_def = board_data.get("grid")
+def _parse_grid(grid_def: dict) -> Grid:
     if not grid_def:
         raise ValueError("board.yaml missing 'grid' section")
+    for key in ("width", "height"):
+        if key not in grid_def:
+            raise ValueError(f"grid: missing required field '{key}'")
+
+    kind = str(grid_def.get("type", "perfboard"))
+    if kind not in ("perfboard", "stripboard"):
+        raise ValueError(f"grid: unknown board type '{kind}'")
+    tracks = str(grid_def.get("tracks", "x"))
+    if tracks not in ("x", "y"):
+        raise ValueError(f"grid: tracks must be 'x' or 'y', got '{tracks}'")
+    cuts: set[Coord] = set()
+    for p in grid_def.get("cuts", []):
+        if len(p) != 2:
+            raise ValueError("grid: cut must have 2 elements")
+        cuts.add(Coord(int(p[0]), int(p[1])))
 
     grid = Grid(
         width=int(grid_def["width"]),
         height=int(grid_def["height"]),
+        min_clearance=int(grid_def.get("min_clearance", 0)),
+        kind=kind,
+        tracks=tracks,
+        cuts=frozenset(cuts),
+        extra=_extra_fields(grid_def, _GRID_FIELDS),
     )
+    for c in cuts:
+        if not grid.contains(c):
+            raise ValueError(f"grid: cut outside grid at ({c.x},{c.y})")
+    return grid
 
-    components: list[ComponentInstance] = []
 
-    for c in board_data.get("components", []):
-        for key in ("ref", "footprint", "x", "y"):
-            if key not in c:
-                raise ValueError(f"Component missing required field '{key}'")
+def _parse_component(c: dict, footprints: Mapping[str, Footprint]) -> ComponentInstance:
+    for key in ("ref", "footprint", "x", "y"):
+        if key not in c:
+            raise ValueError(f"Component missing required field '{key}'")
 
-        fp_name = c["footprint"]
-        if fp_name not in footprints:
-            raise ValueError(f"Unknown footprint '{fp_name}'")
+    fp_name = c["footprint"]
+    if fp_name not in footprints:
+        raise ValueError(f"Unknown footprint '{fp_name}'")
 
-        bbox = None
-        if "bbox" in c:
-            b = c["bbox"]
-            if len(b) != 4:
-                raise ValueError(f"Component '{c['ref']}': bbox must have 4 elements")
-            bbox = tuple(int(v) for v in b)
+    bbox = None
+    if "bbox" in c:
+        b = c["bbox"]
+        if len(b) != 4:
+            raise ValueError(f"Component '{c['ref']}': bbox must have 4 elements")
+        bbox = tuple(int(v) for v in b)
 
-        comp = ComponentInstance(
-            ref=c["ref"],
-            footprint=footprints[fp_name],
-            origin=Coord(int(c["x"]), int(c["y"])),
-            rotation=int(c.get("rotation", 0)),
-            bbox=bbox,
-        )
+    nets: dict[str, str] = {}
+    if "nets" in c:
+        pin_names = {p.name for p in footprints[fp_name].pins}
+        for pin, net in (c["nets"] or {}).items():
+            if str(pin) not in pin_names:
+                raise ValueError(
+                    f"Component '{c['ref']}': footprint '{fp_name}' has no pin '{pin}'"
+                )
+            nets[str(pin)] = str(net)
 
-        components.append(comp)
+    return ComponentInstance(
+        ref=c["ref"],
+        footprint=footprints[fp_name],
+        origin=Coord(int(c["x"]), int(c["y"])),
+        rotation=int(c.get("rotation", 0)),
+        bbox=bbox,
+        nets=nets,
+        extra=_extra_fields(c, _COMPONENT_FIELDS),
+    )
 
-    jumpers: list[Jumper] = []
-    for j in board_data.get("jumpers", []):
-        for key in ("id", "net", "a", "b"):
-            if key not in j:
-                raise ValueError(f"Jumper missing required field '{key}'")
-        a = j["a"]
-        b = j["b"]
-        if len(a) != 2 or len(b) != 2:
-            raise ValueError(f"Jumper '{j['id']}': a/b must be 2-element lists")
-        jumper = Jumper(
-            jid=str(j["id"]),
-            net=str(j["net"]),
-            a=Coord(int(a[0]), int(a[1])),
-            b=Coord(int(b[0]), int(b[1])),
-            color=str(j.get("color") or ""),
-        )
-        jumpers.append(jumper)
 
+def _parse_point(what: str, p, components: Mapping[str, ComponentInstance]):
+    """[x, y], or "REF.pin" resolved to the pin's position: (coord, anchor)."""
+    if isinstance(p, str):
+        ref, _, pin = p.rpartition(".")
+        comp = components.get(ref)
+        coord = comp.pin_position(pin) if comp is not None else None
+        if coord is None:
+            raise ValueError(f"{what}: unknown pin '{p}'")
+        return coord, (ref, pin)
+    if not isinstance(p, list) or len(p) != 2:
+        raise ValueError(f"{what}: point must be [x, y] or 'REF.pin'")
+    return Coord(int(p[0]), int(p[1])), None
+
+
+def _parse_jumper(j: dict, components: Mapping[str, ComponentInstance]) -> Jumper:
+    for key in ("id", "net", "a", "b"):
+        if key not in j:
+            raise ValueError(f"Jumper missing required field '{key}'")
+    what = f"Jumper '{j['id']}'"
+    a, anchor_a = _parse_point(what, j["a"], components)
+    b, anchor_b = _parse_point(what, j["b"], components)
+    anchors = {}
+    if anchor_a:
+        anchors["a"] = anchor_a
+    if anchor_b:
+        anchors["b"] = anchor_b
+    return Jumper(
+        jid=str(j["id"]),
+        net=str(j["net"]),
+        a=a,
+        b=b,
+        color=str(j.get("color") or ""),
+        anchors=anchors,
+        extra=_extra_fields(j, _JUMPER_FIELDS),
+    )
+
+
+def _parse_trace(t: dict, components: Mapping[str, ComponentInstance]) -> Trace:
+    for key in ("id", "net", "points"):
+        if key not in t:
+            raise ValueError(f"Trace missing required field '{key}'")
+    points = t["points"]
+    if not isinstance(points, list) or len(points) < 2:
+        raise ValueError(f"Trace '{t['id']}': points must be list of 2+ coords")
+    coords: list[Coord] = []
+    anchors: dict[int, tuple[str, str]] = {}
+    for i, p in enumerate(points):
+        coord, anchor = _parse_point(f"Trace '{t['id']}'", p, components)
+        coords.append(coord)
+        if anchor:
+            anchors[i] = anchor
+    return Trace(
+        tid=str(t["id"]),
+        net=str(t["net"]),
+        points=coords,
+        anchors=anchors,
+        extra=_extra_fields(t, _TRACE_FIELDS),
+    )
+
+
+# ---------- streaming ----------
+
+def _compose(loader, event) -> yaml.Node:
+    """Build the node tree of one value from parser events.
+
+    Same tag resolution as yaml.composer.Composer, but driven by get_event,
+    which both the pure-Python and the libyaml parser provide.
+    """
+    if isinstance(event, yaml.AliasEvent):
+        raise ValueError("board.yaml: anchors and aliases are not supported")
+
+    if isinstance(event, yaml.ScalarEvent):
+        tag = event.tag
+        if tag is None or tag == "!":
+            tag = loader.resolve(yaml.ScalarNode, event.value, event.implicit)
+        return yaml.ScalarNode(tag, event.value, event.start_mark, event.end_mark, style=event.style)
+
+    if isinstance(event, yaml.SequenceStartEvent):
+        tag = event.tag
+        if tag is None or tag == "!":
+            tag = loader.resolve(yaml.SequenceNode, None, event.implicit)
+        items = []
+        while not loader.check_event(yaml.SequenceEndEvent):
+            items.append(_compose(loader, loader.get_event()))
+        end = loader.get_event()
+        return yaml.SequenceNode(tag, items, event.start_mark, end.end_mark, flow_style=event.flow_style)
+
+    if isinstance(event, yaml.MappingStartEvent):
+        tag = event.tag
+        if tag is None or tag == "!":
+            tag = loader.resolve(yaml.MappingNode, None, event.implicit)
+        pairs = []
+        while not loader.check_event(yaml.MappingEndEvent):
+            key = _compose(loader, loader.get_event())
+            pairs.append((key, _compose(loader, loader.get_event())))
+        end = loader.get_event()
+        return yaml.MappingNode(tag, pairs, event.start_mark, end.end_mark, flow_style=event.flow_style)
+
+    raise ValueError(f"board.yaml: unexpected {event}")
+
+
+def _next_value(loader):
+    return loader.construct_document(_compose(loader, loader.get_event()))
+
+
+def _expect(loader, event_type, what: str):
+    if not loader.check_event(event_type):
+        raise ValueError(f"board.yaml: expected {what}")
+    return loader.get_event()
+
+
+def load_board(
+    path: str,
+    footprints: Mapping[str, Footprint],
+    sections: dict | None = None,
+):
+    """Read board.yaml section by section.
+
+    The document is read as a stream of parser events; every component,
+    jumper and trace is turned into a small dict, validated and converted
+    into its model object before the next one is read, so the raw tree of
+    the whole board is never held in memory. Wiring points given as
+    "REF.pin" refer to components listed above them. Top-level sections
+    other than grid, components, jumpers and traces are put into `sections`
+    as read, if given, so that save can write them back.
+    """
+    grid = None
+    components: list[ComponentInstance] = []
+    jumpers: list[Jumper] = []
     traces: list[Trace] = []
-    for t in board_data.get("traces", []):
-        for key in ("id", "net", "points"):
-            if key not in t:
-                raise ValueError(f"Trace missing required field '{key}'")
-        points = t["points"]
-        if not isinstance(points, list) or len(points) < 2:
-            raise ValueError(f"Trace '{t['id']}': points must be list of 2+ coords")
-        coords: list[Coord] = []
-        for p in points:
-            if len(p) != 2:
-                raise ValueError(f"Trace '{t['id']}': point must have 2 elements")
-            coords.append(Coord(int(p[0]), int(p[1])))
-        traces.append(Trace(tid=str(t["id"]), net=str(t["net"]), points=coords))
-
-    # ВАЖНО: возвращаем board_data тоже
-    return board_data, grid, components, jumpers, traces
+    by_ref: dict[str, ComponentInstance] = {}
+
+    def component(c: dict) -> ComponentInstance:
+        inst = _parse_component(c, footprints)
+        by_ref[inst.ref] = inst
+        return inst
+
+    parsers = {
+        "components": (components, component),
+        "jumpers": (jumpers, lambda j: _parse_jumper(j, by_ref)),
+        "traces": (traces, lambda t: _parse_trace(t, by_ref)),
+    }
+
+    with open(path, "r", encoding="utf-8") as f:
+        loader = _Loader(f)
+        try:
+            _expect(loader, yaml.StreamStartEvent, "a YAML stream")
+            if loader.check_event(yaml.StreamEndEvent):
+                raise ValueError("board.yaml missing 'grid' section")
+            _expect(loader, yaml.DocumentStartEvent, "a document")
+            _expect(loader, yaml.MappingStartEvent, "a mapping at the top level")
+
+            while not loader.check_event(yaml.MappingEndEvent):
+                name = _next_value(loader)
+                if name == "grid":
+                    grid = _parse_grid(_next_value(loader))
+                    continue
+                if name not in parsers:
+                    value = _next_value(loader)
+                    if sections is not None:
+                        sections[name] = value
+                    continue
+
+                items, parse = parsers[name]
+                if loader.check_event(yaml.ScalarEvent):
+                    # `jumpers:` без элементов
+                    if _next_value(loader) is not None:
+                        raise ValueError(f"board.yaml: '{name}' must be a list")
+                    continue
+                _expect(loader, yaml.SequenceStartEvent, f"a list in '{name}'")
+                while not loader.check_event(yaml.SequenceEndEvent):
+                    items.append(parse(_next_value(loader)))
+                loader.get_event()
+        except yaml.YAMLError as e:
+            raise ValueError(f"invalid YAML: {e}") from e
+        except (KeyError, TypeError, AttributeError, IndexError) as e:
+            # значение не того вида: строка вместо списка, число вместо словаря...
+            raise ValueError(f"malformed board: {e!r}") from e
+        finally:
+            loader.dispose()
+
+    if grid is None:
+        raise ValueError("board.yaml missing 'grid' section")
+
+    return grid, components, jumpers, traces
+
+
+@dataclass
+class SaveCache:
+    """Dumped YAML text of every object and top-level section from the last save.
+
+    Keys are ("component", ref), ("jumper", id), ("trace", id) and
+    ("section", name) -- the same keys callers put into `dirty`.
+    """
+    fragments: dict[tuple[str, str], str] = field(default_factory=dict)
+
+
+def _dump(data) -> str:
+    return yaml.dump(data, Dumper=_Dumper, sort_keys=False)
+
+
+def _atomic_write(path: str, text: str) -> None:
+    """Write to a temp file in the same directory, fsync, then rename over path."""
+    # tempfile тянет random и shutil — не нужно `check`, только save
+    import tempfile
+
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix=".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        try:
+            mode = os.stat(path).st_mode & 0o7777
+        except FileNotFoundError:
+            umask = os.umask(0)
+            os.umask(umask)
+            mode = 0o666 & ~umask
+        os.chmod(tmp, mode)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except FileNotFoundError:
+            pass
+        raise
+
+    if hasattr(os, "O_DIRECTORY"):
+        dfd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(dfd)
+        finally:
+            os.close(dfd)
+
+
+def _grid_data(grid: Grid) -> dict:
+    data = {"width": grid.width, "height": grid.height}
+    if grid.min_clearance:
+        data["min_clearance"] = grid.min_clearance
+    if grid.kind != "perfboard":
+        data["type"] = grid.kind
+        data["tracks"] = grid.tracks
+    if grid.cuts:
+        data["cuts"] = [[c.x, c.y] for c in sorted(grid.cuts, key=lambda c: (c.y, c.x))]
+    data.update(grid.extra)
+    return data
+
+
+def _component_data(inst: ComponentInstance) -> dict:
+    data = {
+        "ref": inst.ref,
+        "footprint": inst.footprint.name,
+        "x": inst.origin.x,
+        "y": inst.origin.y,
+        "rotation": inst.rotation,
+    }
+    if inst.bbox is not None:
+        data["bbox"] = list(inst.bbox)
+    if inst.nets:
+        data["nets"] = dict(inst.nets)
+    data.update(inst.extra)
+    return data
+
+
+def _point_data(p: Coord, anchor: tuple[str, str] | None):
+    if anchor:
+        return f"{anchor[0]}.{anchor[1]}"
+    return [p.x, p.y]
+
+
+def _jumper_data(j: Jumper) -> dict:
+    data = {
+        "id": j.jid,
+        "net": j.net,
+        "a": _point_data(j.a, j.anchors.get("a")),
+        "b": _point_data(j.b, j.anchors.get("b")),
+        "color": j.color,
+    }
+    data.update(j.extra)
+    return data
+
+
+def _trace_data(t: Trace) -> dict:
+    data = {
+        "id": t.tid,
+        "net": t.net,
+        "points": [_point_data(p, t.anchors.get(i)) for i, p in enumerate(t.points)],
+    }
+    data.update(t.extra)
+    return data
 
 
 def save_board(
     path: str,
-    board_data: dict,
+    grid: Grid,
     components: list[ComponentInstance],
     jumpers: list[Jumper],
     traces: list[Trace],
+    dirty: set[tuple[str, str]] | None = None,
+    cache: SaveCache | None = None,
+    sections: dict | None = None,
 ):
-    comps_by_ref = {c.ref: c for c in components}
+    """Write the board to `path`, from the model objects alone.
 
-    for c in board_data.get("components", []):
-        ref = c["ref"]
-        if ref not in comps_by_ref:
-            continue
+    With a `cache` from the previous save, only objects listed in `dirty`
+    (or missing from the cache) are dumped again; the rest of the document
+    is stitched together from cached text. `dirty=None` means everything.
+    The file is replaced atomically, so a crash never leaves it half-written.
+    `sections` are the unknown top-level sections from load_board, written
+    after the traces.
+    """
+    if cache is None:
+        cache = SaveCache()
+    fragments = cache.fragments
 
-        inst = comps_by_ref[ref]
-        c["x"] = inst.origin.x
-        c["y"] = inst.origin.y
-        c["rotation"] = inst.rotation
+    def stale(key: tuple[str, str]) -> bool:
+        return dirty is None or key in dirty or key not in fragments
 
-        if inst.bbox is not None:
-            c["bbox"] = list(inst.bbox)
-        else:
-            c.pop("bbox", None)
+    import random
 
-    board_data["jumpers"] = []
     for j in jumpers:
-        color = j.color
-        if not color:
+        if not j.color:
             # Assign once on save to avoid re-randomizing across runs.
             r = random.randint(64, 255)
             g = random.randint(64, 255)
             b = random.randint(64, 255)
-            color = f"#{r:02x}{g:02x}{b:02x}"
-            j.color = color
-        board_data["jumpers"].append(
-            {
-                "id": j.jid,
-                "net": j.net,
-                "a": [j.a.x, j.a.y],
-                "b": [j.b.x, j.b.y],
-                "color": color,
-            }
-        )
-
-    board_data["traces"] = [
-        {
-            "id": t.tid,
-            "net": t.net,
-            "points": [[p.x, p.y] for p in t.points],
-        }
-        for t in traces
-    ]
-
-    with open(path, "w", encoding="utf-8") as f:
-        yaml.safe_dump(board_data, f, sort_keys=False)
+            j.color = f"#{r:02x}{g:02x}{b:02x}"
+            fragments.pop(("jumper", j.jid), None)
+
+    # Документ склеивается из кусков: для блочного YAML дамп ключа
+    # верхнего уровня или элемента списка не зависит от соседей.
+    chunks: list[str] = []
+    used: dict[tuple[str, str], str] = {}
+
+    key = ("section", "grid")
+    text = _dump({"grid": _grid_data(grid)}) if stale(key) else fragments[key]
+    used[key] = text
+    chunks.append(text)
+
+    lists = (
+        ("components", "component", components, lambda c: c.ref, _component_data),
+        ("jumpers", "jumper", jumpers, lambda j: j.jid, _jumper_data),
+        ("traces", "trace", traces, lambda t: t.tid, _trace_data),
+    )
+    for name, kind, objs, ident, to_data in lists:
+        if not objs:
+            chunks.append(f"{name}: []\n")
+            continue
+        chunks.append(f"{name}:\n")
+        for obj in objs:
+            key = (kind, ident(obj))
+            text = _dump([to_data(obj)]) if stale(key) else fragments[key]
+            used[key] = text
+            chunks.append(text)
+
+    for name, value in (sections or {}).items():
+        key = ("section", str(name))
+        text = _dump({name: value}) if stale(key) else fragments[key]
+        used[key] = text
+        chunks.append(text)
+
+    cache.fragments = used
+    _atomic_write(path, "".join(chunks))
@@ -5,7 +5,12 @@ from model import Footprint, Coord, line_pins
 
 def load_footprints(path: str) -> dict[str, Footprint]:
     with open(path, "r", encoding="utf-8") as f:
-        data = yaml.safe_load(f)
+        try:
+            data = yaml.load(f, Loader=getattr(yaml, "CSafeLoader", yaml.SafeLoader))
+        except yaml.YAMLError as e:
+            raise ValueError(f"invalid YAML: {e}") from e
+    if not isinstance(data, dict):
+        raise ValueError("footprints must be a mapping of name -> footprint")
 
     footprints: dict[str, Footprint] = {}
 
@@ -41,6 +46,6 @@ def load_footprints(path: str) -> dict[str, Footprint]:
                 )
             )
 
-        footprints[name] = Footprint(pins=pins)
+        footprints[name] = Footprint(pins=pins, name=name)
 
     return footprints
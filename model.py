@@ -1,4 +1,4 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Optional
 
 @dataclass(frozen=True)
@@ -31,6 +31,7 @@ class Pin:
 @dataclass(frozen=True)
 class Footprint:
     pins: list[Pin]
+    name: str = ""  # ключ в footprints.yaml, пишется в board.yaml при save
 
     def pins_at(self, origin: Coord, rotation: int) -> list[Coord]:
         return [
@@ -45,10 +46,29 @@ class ComponentInstance:
     origin: Coord
     rotation: int  # 0, 90, 180, 270
     bbox: Optional[tuple[int, int, int, int]] = None  # (min_x, min_y, max_x, max_y)
+    nets: dict[str, str] = field(default_factory=dict)  # pin name -> net
+    # ключи board.yaml, которых модель не знает; save пишет их обратно
+    extra: dict[str, object] = field(default_factory=dict)
 
     def placed_pins(self) -> list[Coord]:
         return self.footprint.pins_at(self.origin, self.rotation)
 
+    def pin_position(self, name: str) -> Optional[Coord]:
+        for pin in self.footprint.pins:
+            if pin.name == name:
+                return self.origin.add(pin.offset.rotate(self.rotation))
+        return None
+
+    def pin_nets(self) -> list[tuple[Coord, str]]:
+        """Placed pins that have a net assigned, with that net."""
+        if not self.nets:
+            return []
+        return [
+            (coord, self.nets[pin.name])
+            for pin, coord in zip(self.footprint.pins, self.placed_pins())
+            if pin.name in self.nets
+        ]
+
 
 @dataclass
 class Jumper:
@@ -57,6 +77,10 @@ class Jumper:
     a: Coord
     b: Coord
     color: str
+    # концы, привязанные к пину детали: "a"/"b" -> (ref, имя пина);
+    # a и b при этом хранят текущее положение пина
+    anchors: dict[str, tuple[str, str]] = field(default_factory=dict)
+    extra: dict[str, object] = field(default_factory=dict)
 
 
 @dataclass
@@ -64,7 +88,11 @@ class Trace:
     tid: str
     net: str
     points: list[Coord]
-    
+    # точки, привязанные к пину детали: индекс точки -> (ref, имя пина)
+    anchors: dict[int, tuple[str, str]] = field(default_factory=dict)
+    extra: dict[str, object] = field(default_factory=dict)
+
+
 def line_pins(
     start: Coord,
     axis: str,
@@ -0,0 +1,206 @@
+from math import isqrt
+
+from model import Coord, ComponentInstance, Jumper, Trace
+from grid import Grid, trace_cells
+from stripboard import UnionFind, cuts_by_strip, segment_of
+
+
+# Сколько ближайших чужих кусков цепи берём в граф-кандидат для MST
+NEIGHBOURS = 6
+
+
+def _net_islands(
+    grid: Grid | None,
+    components: list[ComponentInstance],
+    jumpers: list[Jumper],
+    traces: list[Trace],
+) -> dict[str, tuple[list[tuple[int, int]], UnionFind]]:
+    """Per net: all of its points, and which of them are already connected.
+
+    Points are pins with that net, trace cells and jumper ends. A trace or a
+    jumper joins all of its own points; points of the same net in the same
+    hole are joined, and on a stripboard so are points on one strip segment.
+    """
+    cuts = cuts_by_strip(grid) if grid is not None and grid.kind == "stripboard" else None
+    nets: dict[str, tuple[list[tuple[int, int]], UnionFind]] = {}
+
+    def net(name: str):
+        n = nets.get(name)
+        if n is None:
+            n = nets[name] = ([], UnionFind())
+        return n
+
+    def add(name: str, coords: list[Coord]) -> None:
+        points, uf = net(name)
+        first = (coords[0].x, coords[0].y)
+        for c in coords:
+            p = (c.x, c.y)
+            points.append(p)
+            uf.union(first, p)
+            if cuts is not None:
+                seg = segment_of(grid, cuts, c)
+                if seg[0] == "strip":
+                    uf.union(seg, p)
+
+    for comp in components:
+        for coord, name in comp.pin_nets():
+            add(name, [coord])
+    for t in traces:
+        cells = trace_cells(t)
+        if cells:
+            add(t.net, cells)
+    for j in jumpers:
+        add(j.net, [j.a, j.b])
+
+    return nets
+
+
+def _candidate_edges(points: list[tuple[int, int]], uf: UnionFind) -> list[tuple[int, int, int]]:
+    """(distance, i, j): the closest pair of points between each island and
+    each of its NEIGHBOURS nearest islands.
+
+    Points are bucketed on a coarse grid sized so that a bucket holds about
+    one point. Each island walks rings of buckets outwards from its own
+    bounding box and stops once the islands it has met are no farther than
+    the ring, so a nearly routed net costs one walk per island, not per point.
+    """
+    min_x = min(p[0] for p in points)
+    min_y = min(p[1] for p in points)
+    max_x = max(p[0] for p in points)
+    max_y = max(p[1] for p in points)
+    area = (max_x - min_x + 1) * (max_y - min_y + 1)
+    size = max(1, isqrt(area // len(points)))
+    bx_max = (max_x - min_x) // size
+    by_max = (max_y - min_y) // size
+
+    def bucket(p: tuple[int, int]) -> tuple[int, int]:
+        return (p[0] - min_x) // size, (p[1] - min_y) // size
+
+    def ring(x0: int, y0: int, x1: int, y1: int, r: int):
+        """Buckets r rings out from the box (the box itself for r = 0)."""
+        for cy in range(max(0, y0 - r), min(by_max, y1 + r) + 1):
+            if r == 0 or cy in (y0 - r, y1 + r):
+                row = range(max(0, x0 - r), min(bx_max, x1 + r) + 1)
+            else:
+                row = [cx for cx in (x0 - r, x1 + r) if 0 <= cx <= bx_max]
+            for cx in row:
+                yield cx, cy
+
+    def covers(x0: int, y0: int, x1: int, y1: int, r: int) -> bool:
+        return x0 - r <= 0 and y0 - r <= 0 and x1 + r >= bx_max and y1 + r >= by_max
+
+    buckets: dict[tuple[int, int], list[int]] = {}
+    # остров -> его точки по корзинам
+    islands: dict[object, dict[tuple[int, int], list[int]]] = {}
+    roots = [uf.find(p) for p in points]
+    for i, p in enumerate(points):
+        b = bucket(p)
+        buckets.setdefault(b, []).append(i)
+        islands.setdefault(roots[i], {}).setdefault(b, []).append(i)
+
+    def nearest(own: dict[tuple[int, int], list[int]], q: tuple[int, int]) -> tuple[int, int]:
+        """(distance, i) of the point of the island closest to q."""
+        x, y = q
+        if len(own) <= 8:
+            # несколько корзин — быстрее перебрать, чем обходить кольца
+            return min((abs(points[i][0] - x) + abs(points[i][1] - y), i) for b in own.values() for i in b)
+        bx, by = bucket(q)
+        best = None
+        r = 0
+        # за кольцом r всё дальше r * size
+        while best is None or best[0] > r * size:
+            for b in ring(bx, by, bx, by, r):
+                for i in own.get(b, ()):
+                    d = (abs(points[i][0] - x) + abs(points[i][1] - y), i)
+                    if best is None or d < best:
+                        best = d
+            r += 1
+        return best
+
+    need = min(NEIGHBOURS, len(islands) - 1)
+    edges: list[tuple[int, int, int]] = []
+    for root, own in islands.items():
+        box = (
+            min(b[0] for b in own), min(b[1] for b in own),
+            max(b[0] for b in own), max(b[1] for b in own),
+        )
+        first = next(iter(own.values()))
+        single = first[0] if len(own) == 1 and len(first) == 1 else None
+        # чужой остров -> (distance, i, j) ближайшей пары
+        met: dict[object, tuple[int, int, int]] = {}
+        r = 0
+        while True:
+            for b in ring(*box, r):
+                for j in buckets.get(b, ()):
+                    if roots[j] == root:
+                        continue
+                    qx, qy = points[j]
+                    if single is not None:
+                        # одиночный пин — самый частый остров
+                        i = single
+                        d = abs(points[i][0] - qx) + abs(points[i][1] - qy)
+                    else:
+                        d, i = nearest(own, (qx, qy))
+                    if roots[j] not in met or (d, i, j) < met[roots[j]]:
+                        met[roots[j]] = (d, i, j)
+            if len(met) >= need and sorted(e[0] for e in met.values())[need - 1] <= r * size:
+                break
+            if covers(*box, r):
+                break
+            r += 1
+        edges.extend(sorted(met.values())[:need])
+    return edges
+
+
+def _net_mst(points: list[tuple[int, int]], uf: UnionFind) -> list[tuple[Coord, Coord]]:
+    islands = {uf.find(p) for p in points}
+    if len(islands) < 2:
+        return []
+
+    lines: list[tuple[Coord, Coord]] = []
+    edges = _candidate_edges(points, uf)
+    edges.sort()
+    left = len(islands) - 1
+    for d, i, j in edges:
+        a = points[i]
+        b = points[j]
+        if uf.find(a) == uf.find(b):
+            continue
+        uf.union(a, b)
+        lines.append((Coord(*a), Coord(*b)))
+        left -= 1
+        if left == 0:
+            return lines
+
+    # Граф ближайших соседей не связен (далёкие кучки точек) — дотягиваем
+    # каждую оставшуюся кучку до ближайшей точки любой другой перебором.
+    while left:
+        groups: dict[object, list[tuple[int, int]]] = {}
+        for p in points:
+            groups.setdefault(uf.find(p), []).append(p)
+        first, *rest = groups.values()
+        others = [p for g in rest for p in g]
+        d, a, b = min(
+            (abs(a[0] - b[0]) + abs(a[1] - b[1]), a, b)
+            for a in first
+            for b in others
+        )
+        uf.union(a, b)
+        lines.append((Coord(*a), Coord(*b)))
+        left -= 1
+    return lines
+
+
+def ratsnest(
+    grid: Grid | None,
+    components: list[ComponentInstance],
+    jumpers: list[Jumper],
+    traces: list[Trace],
+) -> list[tuple[str, Coord, Coord]]:
+    """Unrouted connections as (net, a, b): a minimum spanning tree per net
+    over the pieces of the net that are not yet connected."""
+    lines: list[tuple[str, Coord, Coord]] = []
+    for name, (points, uf) in sorted(_net_islands(grid, components, jumpers, traces).items()):
+        for a, b in _net_mst(points, uf):
+            lines.append((name, a, b))
+    return lines
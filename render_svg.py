@@ -1,3 +1,6 @@
+import re
+from dataclasses import dataclass
+
 from model import Coord, ComponentInstance, Jumper, Trace
 from grid import Grid
 
@@ -13,8 +16,12 @@ BOX_PAD = 1         # визуальный отступ рамки внутрь,
 COLOR_BG = "#1e1e1e"
 COLOR_BOARD = "#aaaaaa"
 COLOR_HOLE = "#555"
+COLOR_STRIP = "#b87333"
+COLOR_CUT = "#1e1e1e"
+STRIP_WIDTH = 14
 COLOR_PIN_OK = "#55ff55"
 COLOR_PIN_ERR = "#ff5555"
+COLOR_ERR_CELL = "#ff5555"
 COLOR_BOX = "#888888"
 COLOR_JUMPER = "#ffaa00"
 JUMPER_WIDTH = 3
@@ -22,6 +29,8 @@ JUMPER_ARC_OFFSET = 24
 JUMPER_DASH = "6,4"
 COLOR_TRACE = "#33aaff"
 TRACE_WIDTH = 3
+COLOR_RATSNEST = "#ffffff"
+RATSNEST_WIDTH = 1
 COLOR_AXIS_TEXT = "#cccccc"
 AXIS_FONT_SIZE = 10
 AXIS_TICK = 6
@@ -29,33 +38,26 @@ AXIS_TICK = 6
 
 # ---------- helpers ----------
 
-def _flip_coord(coord: Coord, grid: Grid) -> Coord:
-    """Mirror X across center of the grid (0..width-1)."""
-    return Coord(grid.width - 1 - coord.x, coord.y)
+def grid_to_svg(coord: Coord, grid: Grid) -> tuple[int, int]:
+    x = OUTER_MARGIN + INNER_MARGIN + coord.x * SCALE + SCALE // 2
+    y = OUTER_MARGIN + INNER_MARGIN + coord.y * SCALE + SCALE // 2
+    return x, y
 
 
-def grid_to_svg(coord: Coord, grid: Grid, flip: bool = False) -> tuple[int, int]:
-    c = _flip_coord(coord, grid) if flip else coord
-    x = OUTER_MARGIN + INNER_MARGIN + c.x * SCALE + SCALE // 2
-    y = OUTER_MARGIN + INNER_MARGIN + c.y * SCALE + SCALE // 2
+def grid_cell_top_left(coord: Coord, grid: Grid) -> tuple[int, int]:
+    x = OUTER_MARGIN + INNER_MARGIN + coord.x * SCALE
+    y = OUTER_MARGIN + INNER_MARGIN + coord.y * SCALE
     return x, y
 
 
-def grid_cell_top_left(coord: Coord, grid: Grid, flip: bool = False) -> tuple[int, int]:
-    c = _flip_coord(coord, grid) if flip else coord
-    x = OUTER_MARGIN + INNER_MARGIN + c.x * SCALE
-    y = OUTER_MARGIN + INNER_MARGIN + c.y * SCALE
-    return x, y
+_COORD_RE = re.compile(r"Coord\(x=(-?\d+), y=(-?\d+)\)")
 
 
 def extract_error_coords(errors: list[str]) -> set[Coord]:
     coords: set[Coord] = set()
     for e in errors:
-        if "Coord(" not in e:
-            continue
-        part = e.split("Coord(")[1].split(")")[0]
-        x, y = part.replace("x=", "").replace("y=", "").split(", ")
-        coords.add(Coord(int(x), int(y)))
+        for x, y in _COORD_RE.findall(e):
+            coords.add(Coord(int(x), int(y)))
     return coords
 
 
@@ -81,22 +83,9 @@ def component_bbox(comp: ComponentInstance) -> tuple[int, int, int, int] | None:
     )
 
 
-def view_bbox(bbox: tuple[int, int, int, int], grid: Grid, flip: bool) -> tuple[int, int, int, int]:
-    if not flip:
-        return bbox
+def bbox_to_svg_rect(bbox: tuple[int, int, int, int], grid: Grid) -> tuple[int, int, int, int]:
     min_x, min_y, max_x, max_y = bbox
-    return (
-        grid.width - 1 - max_x,
-        min_y,
-        grid.width - 1 - min_x,
-        max_y,
-    )
-
-
-def bbox_to_svg_rect(bbox: tuple[int, int, int, int], grid: Grid, flip: bool) -> tuple[int, int, int, int]:
-    min_x, min_y, max_x, max_y = view_bbox(bbox, grid, flip)
-    # view_bbox already mirrored if needed; avoid double-flip in pixel mapping
-    base_x, base_y = grid_cell_top_left(Coord(min_x, min_y), grid, False)
+    base_x, base_y = grid_cell_top_left(Coord(min_x, min_y), grid)
     x = base_x + BOX_PAD
     y = base_y + BOX_PAD
     w = (max_x - min_x + 1) * SCALE - 2 * BOX_PAD
@@ -106,26 +95,26 @@ def bbox_to_svg_rect(bbox: tuple[int, int, int, int], grid: Grid, flip: bool) ->
 
 # ---------- render parts ----------
 
-def render_background(f, width_px: int, height_px: int):
-    f.write(
+def render_background(out: list[str], width_px: int, height_px: int):
+    out.append(
         f'<rect width="{width_px}" height="{height_px}" fill="{COLOR_BG}"/>\n'
     )
 
 
-def render_board_frame(f, grid: Grid):
+def render_board_frame(out: list[str], grid: Grid):
     board_x = OUTER_MARGIN
     board_y = OUTER_MARGIN
     board_w = grid.width * SCALE + 2 * INNER_MARGIN
     board_h = grid.height * SCALE + 2 * INNER_MARGIN
 
-    f.write(
+    out.append(
         f'<rect x="{board_x}" y="{board_y}" '
         f'width="{board_w}" height="{board_h}" '
         f'fill="none" stroke="{COLOR_BOARD}" stroke-width="2"/>\n'
     )
 
 
-def render_axes(f, grid: Grid, flip: bool):
+def render_axes(out: list[str], labels: list, grid: Grid):
     board_x = OUTER_MARGIN
     board_y = OUTER_MARGIN
     board_w = grid.width * SCALE + 2 * INNER_MARGIN
@@ -133,77 +122,123 @@ def render_axes(f, grid: Grid, flip: bool):
 
     # Column labels (top)
     for x in range(grid.width):
-        cx, _ = grid_to_svg(Coord(x, 0), grid, flip)
-        f.write(
+        cx, _ = grid_to_svg(Coord(x, 0), grid)
+        out.append(
             f'<line x1="{cx}" y1="{board_y}" '
             f'x2="{cx}" y2="{board_y - AXIS_TICK}" '
             f'stroke="{COLOR_AXIS_TEXT}" stroke-width="1"/>\n'
         )
-        f.write(
-            f'<text x="{cx}" y="{board_y - AXIS_TICK - 2}" '
-            f'fill="{COLOR_AXIS_TEXT}" font-size="{AXIS_FONT_SIZE}" '
-            f'text-anchor="middle" font-family="monospace">{x}</text>\n'
+        labels.append(
+            (cx, board_y - AXIS_TICK - 2, "middle", COLOR_AXIS_TEXT, AXIS_FONT_SIZE, str(x))
         )
 
     # Row labels (left)
     for y in range(grid.height):
-        _, cy = grid_to_svg(Coord(0, y), grid, flip)
-        f.write(
+        _, cy = grid_to_svg(Coord(0, y), grid)
+        out.append(
             f'<line x1="{board_x}" y1="{cy}" '
             f'x2="{board_x - AXIS_TICK}" y2="{cy}" '
             f'stroke="{COLOR_AXIS_TEXT}" stroke-width="1"/>\n'
         )
-        f.write(
-            f'<text x="{board_x - AXIS_TICK - 2}" y="{cy + 3}" '
-            f'fill="{COLOR_AXIS_TEXT}" font-size="{AXIS_FONT_SIZE}" '
-            f'text-anchor="end" font-family="monospace">{y}</text>\n'
+        labels.append(
+            (board_x - AXIS_TICK - 2, cy + 3, "end", COLOR_AXIS_TEXT, AXIS_FONT_SIZE, str(y))
         )
 
 
-def render_board_holes(f, grid: Grid, flip: bool):
+def render_board_holes(out: list[str], grid: Grid):
     for y in range(grid.height):
         for x in range(grid.width):
-            cx, cy = grid_to_svg(Coord(x, y), grid, flip)
-            f.write(
+            cx, cy = grid_to_svg(Coord(x, y), grid)
+            out.append(
                 f'<circle cx="{cx}" cy="{cy}" r="{R_HOLE}" '
                 f'fill="{COLOR_HOLE}"/>\n'
             )
 
 
-def render_component_boxes(f, components: list[ComponentInstance], grid: Grid, flip: bool):
+def render_board_strips(
+    out: list[str], grid: Grid, window: tuple[int, int, int, int] | None = None
+):
+    """Strips and cuts; with a window (x0, y0, x1, y1), half-open, only
+    those that overlap it, for a tile of a tiled view."""
+    from stripboard import strip_coord, strip_intervals
+
+    strips = None
+    if window is not None:
+        wx0, wy0, wx1, wy1 = window
+        # вдоль полоски — с запасом в клетку: край линии обрезает viewBox
+        # тайла, а не её скруглённый конец
+        if grid.tracks == "x":
+            strips, lo, hi = range(wy0, wy1), wx0 - 1, wx1
+        else:
+            strips, lo, hi = range(wx0, wx1), wy0 - 1, wy1
+    for strip, spans in strip_intervals(grid, strips).items():
+        for start, end in spans:
+            if strips is not None:
+                if end < lo or start > hi:
+                    continue
+                start, end = max(start, lo), min(end, hi)
+            x1, y1 = grid_to_svg(strip_coord(grid, strip, start), grid)
+            x2, y2 = grid_to_svg(strip_coord(grid, strip, end), grid)
+            out.append(
+                f'<line x1="{x1}" y1="{y1}" x2="{x2}" y2="{y2}" '
+                f'stroke="{COLOR_STRIP}" stroke-width="{STRIP_WIDTH}" '
+                f'stroke-linecap="round" stroke-opacity="0.6"/>\n'
+            )
+    for cut in grid.cuts:
+        if window is not None and not (wx0 <= cut.x < wx1 and wy0 <= cut.y < wy1):
+            continue
+        cx, cy = grid_to_svg(cut, grid)
+        out.append(
+            f'<circle cx="{cx}" cy="{cy}" r="{STRIP_WIDTH // 2}" '
+            f'fill="{COLOR_CUT}"/>\n'
+        )
+
+
+def render_component_boxes(out: list[str], components: list[ComponentInstance], grid: Grid):
     for comp in components:
         bbox = component_bbox(comp)
         if bbox is None:
             continue
-        x, y, w, h = bbox_to_svg_rect(bbox, grid, flip)
+        x, y, w, h = bbox_to_svg_rect(bbox, grid)
 
-        f.write(
+        out.append(
             f'<rect x="{x}" y="{y}" width="{w}" height="{h}" '
             f'fill="none" stroke="{COLOR_BOX}" stroke-width="1" '
             f'stroke-dasharray="4,3"/>\n'
         )
 
 
-def render_pins(f, components: list[ComponentInstance], grid: Grid, flip: bool, error_coords: set[Coord]):
+def render_pins(out: list[str], components: list[ComponentInstance], grid: Grid, error_coords: set[Coord]):
     for comp in components:
         for pin in comp.placed_pins():
-            cx, cy = grid_to_svg(pin, grid, flip)
+            cx, cy = grid_to_svg(pin, grid)
             color = COLOR_PIN_ERR if pin in error_coords else COLOR_PIN_OK
-            f.write(
+            out.append(
                 f'<circle cx="{cx}" cy="{cy}" r="{R_PIN}" '
                 f'fill="{color}" fill-opacity="0.8"/>\n'
             )
 
 
-def render_jumpers(f, jumpers: list[Jumper], grid: Grid, flip: bool):
+def render_error_cells(out: list[str], error_coords: set[Coord], grid: Grid):
+    # Рамка вокруг клетки: видно и ошибки на дорожках, где нет пина
+    for coord in error_coords:
+        x, y = grid_cell_top_left(coord, grid)
+        out.append(
+            f'<rect x="{x + BOX_PAD}" y="{y + BOX_PAD}" '
+            f'width="{SCALE - 2 * BOX_PAD}" height="{SCALE - 2 * BOX_PAD}" '
+            f'fill="none" stroke="{COLOR_ERR_CELL}" stroke-width="2"/>\n'
+        )
+
+
+def render_jumpers(out: list[str], jumpers: list[Jumper], grid: Grid):
     for j in jumpers:
-        ax, ay = grid_to_svg(j.a, grid, flip)
-        bx, by = grid_to_svg(j.b, grid, flip)
+        ax, ay = grid_to_svg(j.a, grid)
+        bx, by = grid_to_svg(j.b, grid)
         color = j.color or COLOR_JUMPER
         if ax == bx and ay == by:
             # Degenerate case: draw a small loop.
             r = JUMPER_ARC_OFFSET // 2
-            f.write(
+            out.append(
                 f'<circle cx="{ax}" cy="{ay}" r="{r}" '
                 f'fill="none" stroke="{color}" stroke-width="{JUMPER_WIDTH}" '
                 f'stroke-dasharray="{JUMPER_DASH}"/>\n'
@@ -223,74 +258,193 @@ def render_jumpers(f, jumpers: list[Jumper], grid: Grid, flip: bool):
         offset = min(JUMPER_ARC_OFFSET, length * 0.3)
         cx = mx + nx * offset
         cy = my + ny * offset
-        f.write(
+        out.append(
             f'<path d="M {ax} {ay} Q {cx:.1f} {cy:.1f} {bx} {by}" '
             f'fill="none" stroke="{color}" stroke-width="{JUMPER_WIDTH}" '
             f'stroke-linecap="round" stroke-dasharray="{JUMPER_DASH}"/>\n'
         )
 
-def render_traces(f, traces: list[Trace], grid: Grid, flip: bool):
+def render_traces(out: list[str], traces: list[Trace], grid: Grid):
     for t in traces:
         if len(t.points) < 2:
             continue
         pts = []
         for p in t.points:
-            x, y = grid_to_svg(p, grid, flip)
+            x, y = grid_to_svg(p, grid)
             pts.append(f"{x},{y}")
         points_attr = " ".join(pts)
-        f.write(
+        out.append(
             f'<polyline points="{points_attr}" '
             f'fill="none" stroke="{COLOR_TRACE}" '
             f'stroke-width="{TRACE_WIDTH}" stroke-linecap="round"/>\n'
         )
 
 
-def render_refs(f, components: list[ComponentInstance], grid: Grid, flip: bool):
+def render_ratsnest(out: list[str], lines: list[tuple[str, Coord, Coord]], grid: Grid):
+    for _, a, b in lines:
+        ax, ay = grid_to_svg(a, grid)
+        bx, by = grid_to_svg(b, grid)
+        out.append(
+            f'<line x1="{ax}" y1="{ay}" x2="{bx}" y2="{by}" '
+            f'stroke="{COLOR_RATSNEST}" stroke-width="{RATSNEST_WIDTH}" '
+            f'stroke-opacity="0.7"/>\n'
+        )
+
+
+def render_refs(labels: list, components: list[ComponentInstance], grid: Grid):
     for comp in components:
-        tx, ty = grid_to_svg(comp.origin, grid, flip)
+        tx, ty = grid_to_svg(comp.origin, grid)
         ty -= 6
 
-        f.write(
-            f'<text x="{tx}" y="{ty}" '
-            f'fill="#ffffff" font-size="10" '
-            f'text-anchor="middle" '
-            f'font-family="monospace">{comp.ref}</text>\n'
+        labels.append((tx, ty, "middle", "#ffffff", 10, comp.ref))
+
+
+def render_labels(out: list[str], labels: list, mirror_width: int | None = None):
+    """Write text labels; with mirror_width, at mirrored positions but readable.
+
+    Text is never put under the mirror transform: only its anchor point is
+    mirrored, and start/end anchors swap so it grows away from the board.
+    """
+    swap = {"start": "end", "end": "start", "middle": "middle"}
+    for x, y, anchor, color, size, text in labels:
+        if mirror_width is not None:
+            x = mirror_width - x
+            anchor = swap[anchor]
+        out.append(
+            f'<text x="{x}" y="{y}" '
+            f'fill="{color}" font-size="{size}" '
+            f'text-anchor="{anchor}" '
+            f'font-family="monospace">{text}</text>\n'
         )
 
 
 # ---------- main render ----------
 
-def render_svg(
+@dataclass
+class Scene:
+    """Board geometry rendered once, in front-side coordinates.
+
+    Each layer is already joined into one string, so writing a side is one
+    write per layer however many elements it has.
+    """
+    width_px: int
+    height_px: int
+    layers: list[str]  # всё, кроме текста
+    labels: list  # (x, y, anchor, color, size, text)
+
+
+def build_scene(
     grid: Grid,
     components: list[ComponentInstance],
     errors: list[str],
     jumpers: list[Jumper] | None = None,
     traces: list[Trace] | None = None,
-    filename: str = "board.svg",
-    flip: bool = False,
-):
+    ratsnest: list[tuple[str, Coord, Coord]] | None = None,
+) -> Scene:
     error_coords = extract_error_coords(errors)
 
     width_px  = grid.width * SCALE + 2 * (OUTER_MARGIN + INNER_MARGIN)
     height_px = grid.height * SCALE + 2 * (OUTER_MARGIN + INNER_MARGIN)
 
-    with open(filename, "w", encoding="utf-8") as f:
-        f.write(
-            f'<svg xmlns="http://www.w3.org/2000/svg" '
-            f'width="{width_px}" height="{height_px}">\n'
-        )
+    layers: list[str] = []
+    labels: list = []
+
+    def layer(render, *args):
+        out: list[str] = []
+        render(out, *args)
+        layers.append("".join(out))
+
+    layer(render_background, width_px, height_px)
+    layer(render_board_frame, grid)
+    layer(render_axes, labels, grid)
+    if grid.kind == "stripboard":
+        layer(render_board_strips, grid)
+    layer(render_board_holes, grid)
+
+    layer(render_component_boxes, components, grid)
+    if traces:
+        layer(render_traces, traces, grid)
+    if jumpers:
+        layer(render_jumpers, jumpers, grid)
+    layer(render_error_cells, error_coords, grid)
+    layer(render_pins, components, grid, error_coords)
+    if ratsnest:
+        layer(render_ratsnest, ratsnest, grid)
+    render_refs(labels, components, grid)
+
+    return Scene(width_px, height_px, layers, labels)
+
+
+def _svg_chunks(scene: Scene, flip: bool):
+    yield (
+        f'<svg xmlns="http://www.w3.org/2000/svg" '
+        f'width="{scene.width_px}" height="{scene.height_px}">\n'
+    )
+    if flip:
+        yield f'<g transform="matrix(-1 0 0 1 {scene.width_px} 0)">\n'
+    else:
+        yield "<g>\n"
+    yield from scene.layers
+    yield "</g>\n"
+    out: list[str] = []
+    render_labels(out, scene.labels, scene.width_px if flip else None)
+    yield "".join(out)
+    yield "</svg>\n"
+
+
+def write_scene(scene: Scene, filename: str, flip: bool = False):
+    """Write one side of the board; the back is the same layers under a mirror.
+
+    A name ending in .svgz is written gzip-compressed, layer by layer.
+    """
+    if filename.endswith(".svgz"):
+        import gzip
 
-        render_background(f, width_px, height_px)
-        render_board_frame(f, grid)
-        render_axes(f, grid, flip)
-        render_board_holes(f, grid, flip)
+        f = gzip.open(filename, "wt", encoding="utf-8", compresslevel=6)
+    else:
+        f = open(filename, "w", encoding="utf-8")
+    with f:
+        for chunk in _svg_chunks(scene, flip):
+            f.write(chunk)
 
-        render_component_boxes(f, components, grid, flip)
-        if traces:
-            render_traces(f, traces, grid, flip)
-        if jumpers:
-            render_jumpers(f, jumpers, grid, flip)
-        render_pins(f, components, grid, flip, error_coords)
-        render_refs(f, components, grid, flip)
 
-        f.write("</svg>\n")
+def scene_bytes(scene: Scene, flip: bool = False, compress: bool = False) -> bytes:
+    """The same document as write_scene, in memory (gzip if compress)."""
+    data = "".join(_svg_chunks(scene, flip)).encode("utf-8")
+    if compress:
+        import gzip
+
+        data = gzip.compress(data, compresslevel=6)
+    return data
+
+
+def render_svg(
+    grid: Grid,
+    components: list[ComponentInstance],
+    errors: list[str],
+    jumpers: list[Jumper] | None = None,
+    traces: list[Trace] | None = None,
+    filename: str = "board.svg",
+    flip: bool = False,
+    ratsnest: list[tuple[str, Coord, Coord]] | None = None,
+) -> Scene:
+    scene = build_scene(grid, components, errors, jumpers, traces, ratsnest)
+    write_scene(scene, filename, flip)
+    return scene
+
+
+def render_sides(
+    grid: Grid,
+    components: list[ComponentInstance],
+    errors: list[str],
+    jumpers: list[Jumper] | None = None,
+    traces: list[Trace] | None = None,
+    front: str = "board_front.svg",
+    back: str = "board_back.svg",
+    ratsnest: list[tuple[str, Coord, Coord]] | None = None,
+) -> Scene:
+    """Both sides from a single geometry pass."""
+    scene = build_scene(grid, components, errors, jumpers, traces, ratsnest)
+    write_scene(scene, front, False)
+    write_scene(scene, back, True)
+    return scene
@@ -0,0 +1,307 @@
+import hashlib
+import json
+import os
+
+from model import Coord, ComponentInstance, Jumper, Trace
+from grid import Grid
+from render_svg import (
+    COLOR_BG,
+    COLOR_HOLE,
+    COLOR_PIN_ERR,
+    COLOR_PIN_OK,
+    INNER_MARGIN,
+    OUTER_MARGIN,
+    R_HOLE,
+    SCALE,
+    component_bbox,
+    extract_error_coords,
+    grid_to_svg,
+    render_board_frame,
+    render_board_strips,
+    render_component_boxes,
+    render_error_cells,
+    render_jumpers,
+    render_labels,
+    render_pins,
+    render_refs,
+    render_traces,
+)
+
+# ---------- config ----------
+
+TILE_CELLS = 64            # клеток по стороне тайла на уровне 0
+TILE_PX = TILE_CELLS * SCALE
+PARALLEL_MIN_TILES = 16    # меньше — пул процессов не окупается
+MANIFEST = "tiles.json"
+
+
+# Уровень z: тайл покрывает TILE_CELLS * 2**z клеток и рисуется в те же
+# TILE_PX пикселей. С z >= 1 отверстия и подписи не рисуются, а пины
+# сливаются в блоки 2**z x 2**z клеток с яркостью по плотности.
+
+def tile_levels(grid: Grid) -> int:
+    z = 0
+    while TILE_CELLS << z < max(grid.width, grid.height):
+        z += 1
+    return z + 1
+
+
+def _tiles_of(bbox: tuple[int, int, int, int], span: int) -> list[tuple[int, int]]:
+    min_x, min_y, max_x, max_y = bbox
+    return [
+        (tx, ty)
+        for ty in range(min_y // span, max_y // span + 1)
+        for tx in range(min_x // span, max_x // span + 1)
+    ]
+
+
+def _points_bbox(points: list[Coord], pad: int = 0) -> tuple[int, int, int, int]:
+    return (
+        min(p.x for p in points) - pad,
+        min(p.y for p in points) - pad,
+        max(p.x for p in points) + pad,
+        max(p.y for p in points) + pad,
+    )
+
+
+def _bucket(grid, components, jumpers, traces, error_coords, span):
+    tiles: dict[tuple[int, int], tuple[list, list, list, set]] = {}
+
+    # пустые тайлы платы тоже нужны: на них отверстия;
+    # то, что за краем платы, в тайлы не попадает
+    for ty in range((grid.height - 1) // span + 1):
+        for tx in range((grid.width - 1) // span + 1):
+            tiles[(tx, ty)] = ([], [], [], set())
+
+    def add(bbox, slot, obj):
+        for key in _tiles_of(bbox, span):
+            t = tiles.get(key)
+            if t is not None:
+                t[slot].append(obj)
+
+    for comp in components:
+        bbox = component_bbox(comp)
+        if bbox is None:
+            continue
+        pins = comp.placed_pins()
+        if pins:
+            bbox = _points_bbox(pins + [Coord(bbox[0], bbox[1]), Coord(bbox[2], bbox[3])])
+        add(bbox, 0, comp)
+    for j in jumpers:
+        # дуга перемычки выгибается примерно на клетку в сторону
+        add(_points_bbox([j.a, j.b], pad=1), 1, j)
+    for t in traces:
+        if t.points:
+            add(_points_bbox(t.points), 2, t)
+    for c in error_coords:
+        t = tiles.get((c.x // span, c.y // span))
+        if t is not None:
+            t[3].add(c)
+
+    return tiles
+
+
+def _object_keys(components, jumpers, traces) -> dict[int, bytes]:
+    """repr of every object, computed once and shared by all tiles and levels."""
+    keys: dict[int, bytes] = {}
+    fp_keys: dict[int, str] = {}
+    for comp in components:
+        fp = fp_keys.get(id(comp.footprint))
+        if fp is None:
+            fp = fp_keys[id(comp.footprint)] = repr(comp.footprint)
+        keys[id(comp)] = repr((comp.ref, comp.origin, comp.rotation, comp.bbox, fp)).encode()
+    for obj in jumpers:
+        keys[id(obj)] = repr(obj).encode()
+    for obj in traces:
+        keys[id(obj)] = repr(obj).encode()
+    return keys
+
+
+def _tile_hash(job: tuple, keys: dict[int, bytes]) -> str:
+    path, z, tx, ty, grid, components, jumpers, traces, errs = job
+    h = hashlib.blake2b(digest_size=16)
+    h.update(repr((z, tx, ty, grid)).encode())
+    for objs in (components, jumpers, traces):
+        for obj in objs:
+            h.update(keys[id(obj)])
+    h.update(repr(sorted((c.y, c.x) for c in errs)).encode())
+    return h.hexdigest()
+
+
+def _render_density(out: list[str], components, error_coords, z, x0, y0, span):
+    block = 1 << z
+    counts: dict[tuple[int, int], int] = {}
+    bad: set[tuple[int, int]] = set()
+    for comp in components:
+        for p in comp.placed_pins():
+            if not (x0 <= p.x < x0 + span and y0 <= p.y < y0 + span):
+                continue
+            key = (p.x // block, p.y // block)
+            counts[key] = counts.get(key, 0) + 1
+            if p in error_coords:
+                bad.add(key)
+
+    size = block * SCALE
+    for (bx, by), n in counts.items():
+        px = OUTER_MARGIN + INNER_MARGIN + bx * size
+        py = OUTER_MARGIN + INNER_MARGIN + by * size
+        color = COLOR_PIN_ERR if (bx, by) in bad else COLOR_PIN_OK
+        opacity = min(1.0, 0.2 + 4 * n / (block * block))
+        out.append(
+            f'<rect x="{px}" y="{py}" width="{size}" height="{size}" '
+            f'fill="{color}" fill-opacity="{opacity:.2f}"/>\n'
+        )
+
+
+def _render_tile(job: tuple) -> None:
+    path, z, tx, ty, grid, components, jumpers, traces, error_coords = job
+    span = TILE_CELLS << z
+    x0 = tx * span
+    y0 = ty * span
+    vx = OUTER_MARGIN + INNER_MARGIN + x0 * SCALE
+    vy = OUTER_MARGIN + INNER_MARGIN + y0 * SCALE
+    vw = span * SCALE
+
+    out: list[str] = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" '
+        f'width="{TILE_PX}" height="{TILE_PX}" '
+        f'viewBox="{vx} {vy} {vw} {vw}">\n',
+        f'<rect x="{vx}" y="{vy}" width="{vw}" height="{vw}" fill="{COLOR_BG}"/>\n',
+    ]
+    render_board_frame(out, grid)
+
+    if z == 0:
+        if grid.kind == "stripboard":
+            render_board_strips(out, grid, (x0, y0, x0 + span, y0 + span))
+        for y in range(y0, min(y0 + span, grid.height)):
+            for x in range(x0, min(x0 + span, grid.width)):
+                cx, cy = grid_to_svg(Coord(x, y), grid)
+                out.append(
+                    f'<circle cx="{cx}" cy="{cy}" r="{R_HOLE}" '
+                    f'fill="{COLOR_HOLE}"/>\n'
+                )
+
+    render_component_boxes(out, components, grid)
+    render_traces(out, traces, grid)
+    render_jumpers(out, jumpers, grid)
+
+    if z == 0:
+        render_error_cells(out, error_coords, grid)
+        render_pins(out, components, grid, error_coords)
+        labels: list = []
+        render_refs(labels, components, grid)
+        render_labels(out, labels)
+    else:
+        _render_density(out, components, error_coords, z, x0, y0, span)
+
+    out.append("</svg>\n")
+
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write("".join(out))
+    os.replace(tmp, path)
+
+
+def _write_index(out_dir: str, grid: Grid, levels: int) -> None:
+    sections = []
+    for z in range(levels):
+        span = TILE_CELLS << z
+        cols = (grid.width - 1) // span + 1
+        rows = (grid.height - 1) // span + 1
+        imgs = "".join(
+            f'<img data-src="z{z}/{tx}_{ty}.svg" loading="lazy" '
+            f'style="left:{tx * TILE_PX}px;top:{ty * TILE_PX}px">'
+            for ty in range(rows)
+            for tx in range(cols)
+        )
+        sections.append(
+            f'<div class="level" id="z{z}" '
+            f'style="width:{cols * TILE_PX}px;height:{rows * TILE_PX}px">{imgs}</div>'
+        )
+    buttons = "".join(
+        f'<button onclick="show({z})">zoom {z}</button>' for z in range(levels)
+    )
+    with open(os.path.join(out_dir, "index.html"), "w", encoding="utf-8") as f:
+        f.write(
+            "<!DOCTYPE html>\n<html><head><meta charset=\"utf-8\"><title>board</title>\n"
+            "<style>body{background:#1e1e1e;margin:0}"
+            ".level{position:relative;display:none}"
+            ".level img{position:absolute;width:" + str(TILE_PX) + "px;height:" + str(TILE_PX) + "px}"
+            "</style></head><body>\n"
+            f"<div>{buttons}</div>\n"
+            + "\n".join(sections) +
+            # src ставит show(z): иначе браузер сразу тянет тайлы всех уровней,
+            # а lazy подгружает из уровня только видимое на экране
+            "\n<script>function show(z){document.querySelectorAll('.level')"
+            ".forEach(e=>e.style.display=e.id=='z'+z?'block':'none');"
+            "document.querySelectorAll('#z'+z+' img:not([src])')"
+            ".forEach(i=>i.src=i.dataset.src)}"
+            f"show({levels - 1})</script>\n</body></html>\n"
+        )
+
+
+def render_tiles(
+    grid: Grid,
+    components: list[ComponentInstance],
+    errors: list[str],
+    jumpers: list[Jumper] | None = None,
+    traces: list[Trace] | None = None,
+    out_dir: str = "board_tiles",
+    workers: int | None = None,
+) -> int:
+    """Write z<level>/<x>_<y>.svg tiles and an index.html into out_dir.
+
+    Each tile's inputs are hashed into tiles.json; on the next call only
+    tiles whose hash changed (or whose file is missing) are rendered again.
+    Returns the number of tiles written.
+    """
+    jumpers = jumpers or []
+    traces = traces or []
+    error_coords = extract_error_coords(errors)
+    levels = tile_levels(grid)
+
+    manifest_path = os.path.join(out_dir, MANIFEST)
+    try:
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            old = json.load(f)
+    except (OSError, ValueError):
+        old = {}
+
+    keys = _object_keys(components, jumpers, traces)
+    manifest: dict[str, str] = {}
+    jobs = []
+    for z in range(levels):
+        span = TILE_CELLS << z
+        os.makedirs(os.path.join(out_dir, f"z{z}"), exist_ok=True)
+        for (tx, ty), (comps, jmps, trs, errs) in _bucket(
+            grid, components, jumpers, traces, error_coords, span
+        ).items():
+            name = f"z{z}/{tx}_{ty}.svg"
+            job = (os.path.join(out_dir, name), z, tx, ty, grid, comps, jmps, trs, errs)
+            digest = _tile_hash(job, keys)
+            manifest[name] = digest
+            if old.get(name) != digest or not os.path.exists(job[0]):
+                jobs.append(job)
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers > 1 and len(jobs) >= PARALLEL_MIN_TILES:
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            list(pool.map(_render_tile, jobs, chunksize=4))
+    else:
+        for job in jobs:
+            _render_tile(job)
+
+    for name in old.keys() - manifest.keys():
+        try:
+            os.remove(os.path.join(out_dir, name))
+        except OSError:
+            pass
+
+    _write_index(out_dir, grid, levels)
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=0, sort_keys=True)
+
+    return len(jobs)
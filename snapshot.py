@@ -0,0 +1,251 @@
+import mmap
+import os
+import tempfile
+from array import array
+
+from model import Coord, ComponentInstance, Jumper, Trace
+
+# Разделы каждого тайла, в этом порядке
+SECTIONS = ("cells", "parts", "rim_cells", "rim_parts", "pins")
+# Массивы BoardObjects, в этом порядке
+OBJECTS = ("footprints", "offsets", "components", "comp_nets", "traces", "points", "jumpers")
+_ITEM = array("i").itemsize
+
+
+def _write(arrays: list[list[array]], groups: list[list[str]]) -> str:
+    """Write int32 arrays and groups of names to a new file; return its path.
+
+    Each array is given as a list of parts, written one after the other.
+    The file holds the number of arrays and of groups, the length of every
+    array and every group and of the names in bytes, then the arrays, then
+    all names, utf-8, one per line.
+    """
+    names = "\n".join(n for g in groups for n in g).encode("utf-8")
+    head = array("i", (len(arrays), len(groups)))
+    head.extend(sum(map(len, parts)) for parts in arrays)
+    head.extend(len(g) for g in groups)
+    head.append(len(names))
+
+    # /dev/shm — память, а не диск, там где он есть
+    shm = "/dev/shm" if os.path.isdir("/dev/shm") else None
+    fd, path = tempfile.mkstemp(prefix="board-", suffix=".snap", dir=shm)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            head.tofile(f)
+            for parts in arrays:
+                for a in parts:
+                    a.tofile(f)
+            f.write(names)
+    except BaseException:
+        os.remove(path)
+        raise
+    return path
+
+
+class _Mapped:
+    """A file written by _write, mapped read-only.
+
+    Workers open it by path, so every process reads the same pages and
+    only the path is pickled. The owner deletes the file on close.
+    """
+
+    def __init__(self, path: str, owner: bool = False):
+        self.path = path
+        self._owner = owner
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(self._map)
+        n_arrays, n_groups = view[: 2 * _ITEM].cast("i")
+        pos = 2 * _ITEM
+        lengths = view[pos: pos + (n_arrays + n_groups + 1) * _ITEM].cast("i").tolist()
+        pos += len(lengths) * _ITEM
+
+        self._arrays: list[memoryview] = []
+        for n in lengths[:n_arrays]:
+            self._arrays.append(view[pos: pos + n * _ITEM].cast("i"))
+            pos += n * _ITEM
+        names = bytes(view[pos: pos + lengths[-1]]).decode("utf-8").split("\n")
+        self._groups: list[list[str]] = []
+        start = 0
+        for n in lengths[n_arrays:-1]:
+            self._groups.append(names[start: start + n])
+            start += n
+        self._view = view
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        for a in self._arrays:
+            a.release()
+        self._view.release()
+        self._map.close()
+        if self._owner:
+            os.remove(self.path)
+
+
+class BoardObjects(_Mapped):
+    """Components, traces and jumpers as int32 arrays, for the first DRC pass.
+
+      footprints (start, n)                    pins of each footprint in offsets
+      offsets    (dx, dy)                      pin offsets, in footprint order
+      components (fp, x, y, rotation, start, n) n pairs in comp_nets from start
+      comp_nets  (pin, net)                    pins with a net, by pin index
+      traces     (net, start, n)               n points in points from start
+      points     (x, y)
+      jumpers    (net, ax, ay, bx, by)
+    The names are the net names, component refs and trace ids.
+    """
+
+    def __init__(self, path: str, owner: bool = False):
+        super().__init__(path, owner)
+        for name, a in zip(OBJECTS, self._arrays):
+            setattr(self, name, a)
+        self.nets, self.refs, self.tids = self._groups
+
+
+def publish_objects(
+    components: list[ComponentInstance],
+    jumpers: list[Jumper],
+    traces: list[Trace],
+    net_ids: dict[str, int],
+) -> BoardObjects:
+    """Write the objects to a BoardObjects file and map it. Closing the result deletes the file."""
+    footprints = array("i")
+    offsets = array("i")
+    fp_ids: dict[int, int] = {}
+    comps = array("i")
+    comp_nets = array("i")
+    for c in components:
+        fp = fp_ids.get(id(c.footprint))
+        if fp is None:
+            # библиотека общая: футпринт пишется один раз
+            fp = fp_ids[id(c.footprint)] = len(fp_ids)
+            footprints.extend((len(offsets) // 2, len(c.footprint.pins)))
+            for pin in c.footprint.pins:
+                offsets.extend((pin.offset.x, pin.offset.y))
+        start = len(comp_nets) // 2
+        for i, pin in enumerate(c.footprint.pins):
+            net = c.nets.get(pin.name)
+            if net is not None:
+                comp_nets.extend((i, net_ids[net]))
+        comps.extend((fp, c.origin.x, c.origin.y, c.rotation, start, len(comp_nets) // 2 - start))
+
+    trs = array("i")
+    points = array("i")
+    for t in traces:
+        trs.extend((net_ids[t.net], len(points) // 2, len(t.points)))
+        for p in t.points:
+            points.extend((p.x, p.y))
+
+    jmp = array("i")
+    for j in jumpers:
+        jmp.extend((net_ids[j.net], j.a.x, j.a.y, j.b.x, j.b.y))
+
+    path = _write(
+        [[footprints], [offsets], [comps], [comp_nets], [trs], [points], [jmp]],
+        [list(net_ids), [c.ref for c in components], [t.tid for t in traces]],
+    )
+    return BoardObjects(path, owner=True)
+
+
+class BoardSnapshot(_Mapped):
+    """Net cells and pins of a board by tile, for the second DRC pass.
+
+    An index has one row per tile: (tx, ty, then start and length of each
+    section); the sections themselves are int32 arrays:
+      cells      (x, y, net)            net cells in the tile
+      parts      (x, y, component)      pins with a net
+      rim_cells  (x, y, net)            cells within min_clearance of the edge
+      rim_parts  (x, y, component)      pins with a net, likewise
+      pins       (component, pin, x, y) pins on the grid, in board order
+    Nets and components are numbered as in the BoardObjects of the same run.
+    Neighbouring tiles read only the rim sections.
+    """
+
+    def __init__(self, path: str, owner: bool = False):
+        super().__init__(path, owner)
+        header, index, self._data = self._arrays
+        self.tile_size = header[0]
+        row = 2 + 2 * len(SECTIONS)
+        self._index: dict[tuple[int, int], tuple[int, ...]] = {
+            (index[k], index[k + 1]): tuple(index[k + 2: k + row])
+            for k in range(0, len(index), row)
+        }
+
+    def tile(self, key: tuple[int, int], section: str) -> memoryview:
+        """One section of one tile, as a flat int32 view (empty if no such tile)."""
+        row = self._index.get(key)
+        if row is None:
+            return memoryview(b"").cast("i")
+        k = 2 * SECTIONS.index(section)
+        start, n = row[k], row[k + 1]
+        return self._data[start: start + n]
+
+    def window(
+        self, key: tuple[int, int], clearance: int, nets: list[str], refs: list[str]
+    ) -> tuple[dict[str, set[Coord]], dict[tuple[int, int], str], set[Coord]]:
+        """What the clearance check of one tile needs.
+
+        Net cells of the tile and those of its neighbours within clearance
+        of it, the part of every pin among them, and the tile's own cells.
+        """
+        size = self.tile_size
+        tx, ty = key
+        x0 = tx * size - clearance
+        y0 = ty * size - clearance
+        x1 = (tx + 1) * size + clearance
+        y1 = (ty + 1) * size + clearance
+        reach = -(-clearance // size)
+
+        sources: dict[str, set[Coord]] = {}
+        parts: dict[tuple[int, int], str] = {}
+        core: set[Coord] = set()
+
+        it = iter(self.tile(key, "cells"))
+        for x, y, net in zip(it, it, it):
+            c = Coord(x, y)
+            sources.setdefault(nets[net], set()).add(c)
+            core.add(c)
+        if not core:
+            return sources, parts, core
+
+        # при наложении пинов побеждает последняя деталь, как в pin_parts;
+        # пины разных тайлов в одной клетке не бывают
+        it = iter(self.tile(key, "parts"))
+        for x, y, comp in zip(it, it, it):
+            parts[(x, y)] = refs[comp]
+
+        for ny in range(ty - reach, ty + reach + 1):
+            for nx in range(tx - reach, tx + reach + 1):
+                if (nx, ny) == key:
+                    continue
+                it = iter(self.tile((nx, ny), "rim_cells"))
+                for x, y, net in zip(it, it, it):
+                    if x0 <= x < x1 and y0 <= y < y1:
+                        sources.setdefault(nets[net], set()).add(Coord(x, y))
+                it = iter(self.tile((nx, ny), "rim_parts"))
+                for x, y, comp in zip(it, it, it):
+                    if x0 <= x < x1 and y0 <= y < y1:
+                        parts[(x, y)] = refs[comp]
+        return sources, parts, core
+
+
+def publish(tile_size: int, tiles: dict[tuple[int, int], list[array]]) -> BoardSnapshot:
+    """Write the per-tile arrays (in SECTIONS order) to a snapshot file and map it.
+
+    Closing the result deletes the file.
+    """
+    index = array("i")
+    data: list[array] = []
+    start = 0
+    for (tx, ty), arrays in tiles.items():
+        index.extend((tx, ty))
+        for a in arrays:
+            index.extend((start, len(a)))
+            start += len(a)
+            data.append(a)
+    return BoardSnapshot(_write([[array("i", (tile_size,))], [index], data], []), owner=True)
@@ -0,0 +1,210 @@
+from bisect import bisect_left
+
+from model import Coord, ComponentInstance, Jumper, Trace
+from grid import Grid, net_cells, trace_cells
+
+
+# Полоска целиком — интервал между разрезами, по клеткам не ходим:
+# клетка -> (номер полоски, позиция), сегмент ищется бинпоиском по разрезам.
+
+class UnionFind:
+    def __init__(self):
+        self.parent: dict = {}
+
+    def find(self, x):
+        parent = self.parent
+        parent.setdefault(x, x)
+        root = x
+        while parent[root] != root:
+            root = parent[root]
+        while parent[x] != root:
+            parent[x], x = root, parent[x]
+        return root
+
+    def union(self, a, b):
+        ra = self.find(a)
+        rb = self.find(b)
+        if ra != rb:
+            self.parent[rb] = ra
+
+
+def strip_pos(grid: Grid, coord: Coord) -> tuple[int, int]:
+    """(strip index, position along the strip) of a hole."""
+    if grid.tracks == "x":
+        return coord.y, coord.x
+    return coord.x, coord.y
+
+
+def strip_coord(grid: Grid, strip: int, pos: int) -> Coord:
+    if grid.tracks == "x":
+        return Coord(pos, strip)
+    return Coord(strip, pos)
+
+
+def strip_length(grid: Grid) -> int:
+    return grid.width if grid.tracks == "x" else grid.height
+
+
+def cuts_by_strip(grid: Grid) -> dict[int, list[int]]:
+    by_strip: dict[int, list[int]] = {}
+    for c in grid.cuts:
+        strip, pos = strip_pos(grid, c)
+        by_strip.setdefault(strip, []).append(pos)
+    for positions in by_strip.values():
+        positions.sort()
+    return by_strip
+
+
+def strip_intervals(grid: Grid, strips: range | None = None) -> dict[int, list[tuple[int, int]]]:
+    """Copper intervals [start, end] of every strip (or of `strips`), split at the cuts."""
+    cuts = cuts_by_strip(grid)
+    n_strips = grid.height if grid.tracks == "x" else grid.width
+    last = strip_length(grid) - 1
+    intervals: dict[int, list[tuple[int, int]]] = {}
+    if strips is None:
+        strips = range(n_strips)
+    for strip in range(max(strips.start, 0), min(strips.stop, n_strips)):
+        start = 0
+        spans = []
+        for pos in cuts.get(strip, []):
+            if pos > start:
+                spans.append((start, pos - 1))
+            start = pos + 1
+        if start <= last:
+            spans.append((start, last))
+        intervals[strip] = spans
+    return intervals
+
+
+def segment_of(grid: Grid, cuts: dict[int, list[int]], coord: Coord):
+    """Union-find node of the copper under a hole.
+
+    A hole on the strip maps to its (strip, segment) interval; holes off the
+    board or on a cut are isolated and get a node of their own.
+    """
+    if grid.kind != "stripboard" or not grid.contains(coord):
+        return ("hole", coord)
+    strip, pos = strip_pos(grid, coord)
+    positions = cuts.get(strip, [])
+    k = bisect_left(positions, pos)
+    if k < len(positions) and positions[k] == pos:
+        return ("hole", coord)
+    return ("strip", strip, k)
+
+
+def strip_connectivity(
+    grid: Grid,
+    components: list[ComponentInstance],
+    jumpers: list[Jumper],
+    traces: list[Trace],
+) -> tuple[UnionFind, dict]:
+    cuts = cuts_by_strip(grid)
+    uf = UnionFind()
+    node_of: dict[Coord, object] = {}
+
+    def node(coord: Coord):
+        n = node_of.get(coord)
+        if n is None:
+            n = segment_of(grid, cuts, coord)
+            node_of[coord] = n
+            uf.find(n)
+        return n
+
+    for comp in components:
+        for pin in comp.placed_pins():
+            node(pin)
+    for j in jumpers:
+        uf.union(node(j.a), node(j.b))
+    for t in traces:
+        cells = trace_cells(t)
+        first = node(cells[0]) if cells else None
+        for c in cells[1:]:
+            uf.union(first, node(c))
+
+    return uf, node_of
+
+
+def check_strips(
+    grid: Grid,
+    components: list[ComponentInstance],
+    jumpers: list[Jumper],
+    traces: list[Trace],
+) -> list[str]:
+    if grid.kind != "stripboard":
+        return []
+
+    uf, node_of = strip_connectivity(grid, components, jumpers, traces)
+
+    # Для каждой связной группы — первая (y, x) клетка каждой цепи
+    groups: dict[object, dict[str, Coord]] = {}
+    for net, cells in sorted(net_cells(jumpers, traces, components).items()):
+        for c in sorted(cells, key=lambda c: (c.y, c.x)):
+            nets = groups.setdefault(uf.find(node_of[c]), {})
+            nets.setdefault(net, c)
+
+    errors: list[str] = []
+    for nets in groups.values():
+        if len(nets) < 2:
+            continue
+        names = sorted(nets)
+        first = names[0]
+        for other in names[1:]:
+            errors.append(
+                f"strip short {first}/{other}: {nets[first]} connected to {nets[other]}"
+            )
+    return errors
+
+
+def propose_cuts(
+    grid: Grid,
+    components: list[ComponentInstance],
+    jumpers: list[Jumper],
+    traces: list[Trace],
+) -> tuple[list[Coord], list[str]]:
+    """Minimal set of new cuts that leaves a single net on every strip segment.
+
+    Along one segment, the nets are read in order of position; every change
+    of net needs exactly one cut in the gap between the two cells, so the
+    number of cuts is the number of net changes. A cut goes in the free hole
+    closest to the middle of the gap. Gaps without a free hole are returned
+    as problems instead.
+    """
+    if grid.kind != "stripboard":
+        return [], []
+
+    cuts = cuts_by_strip(grid)
+    occupied: set[Coord] = set()
+    for comp in components:
+        occupied.update(comp.placed_pins())
+
+    labels: dict[object, list[tuple[int, str, Coord]]] = {}
+    for net, cells in net_cells(jumpers, traces, components).items():
+        occupied.update(cells)
+        for c in cells:
+            seg = segment_of(grid, cuts, c)
+            if seg[0] != "strip":
+                continue
+            labels.setdefault(seg, []).append((strip_pos(grid, c)[1], net, c))
+
+    proposed: list[Coord] = []
+    problems: list[str] = []
+    for seg in sorted(labels):
+        strip = seg[1]
+        marks = sorted(labels[seg], key=lambda m: (m[0], m[1]))
+        for (pos_a, net_a, ca), (pos_b, net_b, cb) in zip(marks, marks[1:]):
+            if net_a == net_b:
+                continue
+            mid = (pos_a + pos_b) / 2
+            free = [
+                p for p in range(pos_a + 1, pos_b)
+                if strip_coord(grid, strip, p) not in occupied
+            ]
+            if not free:
+                problems.append(
+                    f"cannot separate {net_a}/{net_b}: no free hole between {ca} and {cb}"
+                )
+                continue
+            best = min(free, key=lambda p: (abs(p - mid), p))
+            proposed.append(strip_coord(grid, strip, best))
+
+    return proposed, problems
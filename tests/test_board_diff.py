@@ -0,0 +1,36 @@
+from dataclasses import replace
+
+from board_diff import diff_boards, format_change
+from grid import Grid
+from model import ComponentInstance, Coord, Footprint, Jumper, Pin
+
+FOOTPRINT = Footprint([Pin("1", Coord(0, 0)), Pin("2", Coord(1, 0))], "f")
+
+
+def board(grid: Grid, anchored: bool):
+    comp = ComponentInstance("R1", FOOTPRINT, Coord(1, 1), 0)
+    anchors = {"a": ("R1", "1")} if anchored else {}
+    jumper = Jumper("1", "A", Coord(1, 1), Coord(5, 5), "#ffffff", anchors)
+    return grid, [comp], [jumper], []
+
+
+def changes(old, new) -> list[str]:
+    return [format_change(c) for c in diff_boards(old, new, [], []).changes]
+
+
+def test_grid_changes():
+    old = Grid(10, 10, kind="stripboard", cuts=frozenset({Coord(2, 3)}))
+    new = replace(old, height=12, min_clearance=1, cuts=frozenset({Coord(4, 3)}))
+    assert changes(board(old, False), board(new, False)) == [
+        "~ grid height changed 10 -> 12",
+        "~ grid min_clearance changed 0 -> 1",
+        "+ grid cut added (4,3)",
+        "- grid cut removed (2,3)",
+    ]
+
+
+def test_anchor_change_without_move():
+    grid = Grid(10, 10)
+    assert changes(board(grid, True), board(grid, False)) == [
+        "~ jumper 1 changed anchors a=R1.1 -> none",
+    ]
@@ -0,0 +1,89 @@
+import random
+from collections import Counter
+from dataclasses import replace
+
+import pytest
+
+from drc import check_board, check_region, covered_cells, run_drc
+from grid import Grid
+from model import ComponentInstance, Coord, Footprint, Jumper, Pin, Trace
+from transform import Transform, WiringIndex, attached_wiring, transform_selection
+
+FOOTPRINT = Footprint([Pin("1", Coord(0, 0)), Pin("2", Coord(1, 0)), Pin("3", Coord(0, 2))], "f")
+
+
+def random_board(seed: int):
+    """Small board with overlaps, shorts, off-grid points and bad segments."""
+    rnd = random.Random(seed)
+    w, h = rnd.randint(20, 60), rnd.randint(20, 60)
+    grid = Grid(w, h, min_clearance=rnd.randint(0, 8))
+    components = [
+        ComponentInstance(
+            f"C{i}", FOOTPRINT,
+            Coord(rnd.randint(-1, w), rnd.randint(-1, h)),
+            rnd.choice([0, 90, 180, 270]),
+            nets={"1": rnd.choice("ABCD"), "3": rnd.choice("ABCD")},
+        )
+        for i in range(30)
+    ]
+    jumpers = [
+        Jumper(
+            str(i), rnd.choice("ABCDE"),
+            Coord(rnd.randint(0, w), rnd.randint(0, h)),
+            Coord(rnd.randint(0, w), rnd.randint(0, h)),
+            "",
+        )
+        for i in range(10)
+    ]
+    traces = []
+    for i in range(10):
+        x, y = rnd.randint(-2, w), rnd.randint(0, h)
+        points = [Coord(x, y)]
+        for _ in range(3):
+            r = rnd.random()
+            if r < 0.45:
+                x = rnd.randint(-2, w + 1)
+            elif r < 0.9:
+                y = rnd.randint(0, h)
+            else:
+                x, y = x + 1, y + 1
+            points.append(Coord(x, y))
+        traces.append(Trace(str(i), rnd.choice("ABCDE"), points))
+    return grid, components, jumpers, traces
+
+
+@pytest.mark.parametrize("seed", range(12))
+def test_parallel_matches_serial(seed):
+    board = random_board(seed)
+    tile_size = random.Random(seed).randint(3, 20)
+    assert run_drc(*board, workers=2, tile_size=tile_size) == check_board(*board)
+
+
+def test_parallel_finds_errors():
+    errors = run_drc(*random_board(0), workers=2, tile_size=5)
+    assert any(e.startswith("conflict at") for e in errors)
+    assert any(e.startswith(("short", "clearance")) for e in errors)
+
+
+@pytest.mark.parametrize("seed", range(12))
+def test_region_recheck_matches_full(seed):
+    grid, components, jumpers, traces = random_board(seed)
+    rnd = random.Random(seed)
+    selection = rnd.sample(components, 3)
+    index = WiringIndex(components, jumpers, traces)
+    moved_jumpers, moved_traces = attached_wiring(selection, index)
+    old = {id(o): replace(o) for o in selection + moved_jumpers}
+    old.update({id(t): replace(t, points=list(t.points)) for t in moved_traces})
+    old_board = tuple([old.get(id(o), o) for o in objs] for objs in (components, jumpers, traces))
+    before_cells = covered_cells(selection, moved_jumpers, moved_traces)
+    full = check_board(grid, *old_board)
+
+    t = Transform.translate(rnd.randint(-3, 3), rnd.randint(-3, 3))
+    transform_selection(selection, jumpers, traces, t, index)
+
+    cells = before_cells | covered_cells(selection, moved_jumpers, moved_traces)
+    before = check_region(grid, *old_board, cells, [old[id(j)] for j in moved_jumpers],
+                          [old[id(t)] for t in moved_traces])
+    after = check_region(grid, components, jumpers, traces, cells, moved_jumpers, moved_traces)
+    merged = Counter(full) - Counter(before) + Counter(after)
+    assert merged == Counter(check_board(grid, components, jumpers, traces))
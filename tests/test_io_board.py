@@ -0,0 +1,54 @@
+from io_board import load_board, save_board
+from model import Coord, Footprint, Pin
+
+FOOTPRINTS = {"f": Footprint([Pin("1", Coord(0, 0)), Pin("2", Coord(1, 0))], "f")}
+
+BOARD = """\
+name: demo
+grid:
+  width: 10
+  height: 10
+  vendor: acme
+components:
+- ref: R1
+  footprint: f
+  x: 1
+  y: 1
+  rotation: 0
+  value: 10k
+jumpers:
+- id: '1'
+  net: A
+  a: R1.1
+  b: [5, 5]
+  color: '#ffffff'
+  note: keep
+traces:
+- id: '1'
+  net: A
+  points: [R1.2, [2, 4]]
+  layer: top
+notes:
+- one
+"""
+
+
+def test_unknown_keys_survive_save(tmp_path):
+    path = tmp_path / "board.yaml"
+    path.write_text(BOARD, encoding="utf-8")
+    sections: dict = {}
+    grid, components, jumpers, traces = load_board(str(path), FOOTPRINTS, sections)
+
+    assert grid.extra == {"vendor": "acme"}
+    assert components[0].extra == {"value": "10k"}
+    assert jumpers[0].extra == {"note": "keep"}
+    assert traces[0].extra == {"layer": "top"}
+    assert sections == {"name": "demo", "notes": ["one"]}
+
+    out = tmp_path / "saved.yaml"
+    save_board(str(out), grid, components, jumpers, traces, sections=sections)
+    again: dict = {}
+    board = load_board(str(out), FOOTPRINTS, again)
+    assert board == (grid, components, jumpers, traces)
+    assert board[0].extra == grid.extra
+    assert again == sections
@@ -0,0 +1,59 @@
+import random
+
+import pytest
+
+from ratsnest import _net_mst
+from stripboard import UnionFind
+
+
+def random_net(seed: int):
+    """Pins and short wiggly traces of one net, joined per piece."""
+    rnd = random.Random(seed)
+    w = rnd.choice([5, 30, 200])
+    points: list[tuple[int, int]] = []
+    uf = UnionFind()
+    for _ in range(rnd.randint(1, 25)):
+        x, y = rnd.randint(0, w), rnd.randint(0, w)
+        first = (x, y)
+        points.append(first)
+        for _ in range(rnd.choice([0, 0, 3, 30])):
+            if rnd.random() < 0.5:
+                x += rnd.choice([-1, 1])
+            else:
+                y += rnd.choice([-1, 1])
+            points.append((x, y))
+            uf.union(first, (x, y))
+    return points, uf
+
+
+def mst_length(points, uf) -> int:
+    """Kruskal over every pair of points."""
+    edges = sorted(
+        (abs(a[0] - b[0]) + abs(a[1] - b[1]), a, b)
+        for k, a in enumerate(points)
+        for b in points[k + 1:]
+    )
+    total = 0
+    for d, a, b in edges:
+        if uf.find(a) != uf.find(b):
+            uf.union(a, b)
+            total += d
+    return total
+
+
+@pytest.mark.parametrize("seed", range(40))
+def test_mst_is_minimal(seed):
+    points, uf = random_net(seed)
+    expected = mst_length(points, random_net(seed)[1])
+    lines = _net_mst(points, uf)
+    assert sum(abs(a.x - b.x) + abs(a.y - b.y) for a, b in lines) == expected
+    assert len({uf.find(p) for p in points}) == 1
+
+
+def test_long_trace_and_one_pin():
+    points = [(x, 5) for x in range(3000)] + [(3040, 30)]
+    uf = UnionFind()
+    for p in points[:-1]:
+        uf.union(points[0], p)
+    lines = _net_mst(points, uf)
+    assert [(a.x, a.y, b.x, b.y) for a, b in lines] in ([(2999, 5, 3040, 30)], [(3040, 30, 2999, 5)])
@@ -0,0 +1,32 @@
+import pytest
+
+from model import ComponentInstance, Coord, Footprint, Jumper, Pin
+from transform import Transform, transform_selection
+
+ROW = Footprint([Pin("1", Coord(0, 0)), Pin("2", Coord(1, 0)), Pin("3", Coord(2, 0))], "row")
+ELL = Footprint([Pin("1", Coord(0, 0)), Pin("2", Coord(1, 0)), Pin("3", Coord(0, 2))], "ell")
+
+
+def test_mirror_keeps_wiring_on_pins():
+    comp = ComponentInstance("J1", ROW, Coord(4, 3), 90)
+    on_cell = Jumper("1", "A", comp.pin_position("1"), Coord(0, 0), "")
+    anchored = Jumper("2", "A", comp.pin_position("3"), Coord(9, 9), "", {"a": ("J1", "3")})
+    pins = comp.placed_pins()
+    t = Transform.mirror_x(20)
+
+    transform_selection([comp], [on_cell, anchored], [], t)
+
+    assert comp.placed_pins() == t.apply_all(pins)
+    assert on_cell.a == comp.pin_position("1")
+    assert anchored.a == comp.pin_position("3")
+
+
+def test_mirror_refuses_asymmetric_footprint():
+    comp = ComponentInstance("U1", ELL, Coord(4, 3), 0)
+    jumper = Jumper("1", "A", comp.pin_position("2"), Coord(0, 0), "")
+
+    with pytest.raises(ValueError, match="U1"):
+        transform_selection([comp], [jumper], [], Transform.mirror_x(10))
+
+    assert (comp.origin, comp.rotation) == (Coord(4, 3), 0)
+    assert jumper.a == Coord(5, 3)
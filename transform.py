@@ -0,0 +1,261 @@
+from dataclasses import dataclass
+
+from model import Coord, ComponentInstance, Jumper, Trace
+
+
+@dataclass(frozen=True)
+class Transform:
+    """Integer affine map of grid cells: x' = xx*x + xy*y + tx, y' = yx*x + yy*y + ty."""
+    xx: int = 1
+    xy: int = 0
+    yx: int = 0
+    yy: int = 1
+    tx: int = 0
+    ty: int = 0
+
+    @staticmethod
+    def translate(dx: int, dy: int) -> "Transform":
+        return Transform(tx=dx, ty=dy)
+
+    @staticmethod
+    def rotate(rotation: int, center: Coord) -> "Transform":
+        # Тот же поворот, что и Coord.rotate, но вокруг center
+        if rotation not in (0, 90, 180, 270):
+            raise ValueError("rotation must be one of 0, 90, 180, 270")
+        ux = Coord(1, 0).rotate(rotation)
+        uy = Coord(0, 1).rotate(rotation)
+        xx, yx = ux.x, ux.y
+        xy, yy = uy.x, uy.y
+        return Transform(
+            xx, xy, yx, yy,
+            center.x - (xx * center.x + xy * center.y),
+            center.y - (yx * center.x + yy * center.y),
+        )
+
+    @staticmethod
+    def mirror_x(axis2: int) -> "Transform":
+        """Mirror across the vertical line x = axis2 / 2."""
+        return Transform(xx=-1, tx=axis2)
+
+    @property
+    def is_mirror(self) -> bool:
+        return self.xx * self.yy - self.xy * self.yx < 0
+
+    @property
+    def rotation(self) -> int:
+        """Rotation part, in the sense of Coord.rotate (mirror factored out)."""
+        xx, yx = self.xx, self.yx
+        if self.is_mirror:
+            xx = -xx
+            yx = -yx
+        for r in (0, 90, 180, 270):
+            u = Coord(1, 0).rotate(r)
+            if (u.x, u.y) == (xx, yx):
+                return r
+        raise ValueError("transform is not a multiple of 90 degrees")
+
+    def apply_all(self, coords: list[Coord]) -> list[Coord]:
+        xx, xy, yx, yy, tx, ty = self.xx, self.xy, self.yx, self.yy, self.tx, self.ty
+        return [Coord(xx * c.x + xy * c.y + tx, yx * c.x + yy * c.y + ty) for c in coords]
+
+    def component_rotation(self, rotation: int) -> int:
+        if self.is_mirror:
+            rotation = -rotation
+        return (rotation + self.rotation) % 360
+
+    def placement(self, comp: ComponentInstance) -> tuple[Coord, int] | None:
+        """Origin and rotation that put every pin of `comp` where this map sends it.
+
+        None if no rotation does: a part can't be flipped, so only footprints
+        that are symmetric (pin names included) can be mirrored.
+        """
+        if not self.is_mirror or not comp.footprint.pins:
+            return self.apply_all([comp.origin])[0], self.component_rotation(comp.rotation)
+        targets = self.apply_all(comp.placed_pins())
+        first = comp.footprint.pins[0].offset
+        natural = self.component_rotation(comp.rotation)
+        for r in (natural, *(r for r in (0, 90, 180, 270) if r != natural)):
+            off = first.rotate(r)
+            origin = Coord(targets[0].x - off.x, targets[0].y - off.y)
+            if comp.footprint.pins_at(origin, r) == targets:
+                return origin, r
+        return None
+
+
+def selection_bounds(selection: list[ComponentInstance]) -> tuple[int, int, int, int] | None:
+    pins = [p for comp in selection for p in comp.placed_pins()]
+    if not pins:
+        return None
+    return (
+        min(p.x for p in pins),
+        min(p.y for p in pins),
+        max(p.x for p in pins),
+        max(p.y for p in pins),
+    )
+
+
+class WiringIndex:
+    """Which wiring points sit on which components, so a move visits only them.
+
+    anchored[ref] holds (object, slot, pin index) for points tied to a pin
+    as "REF.pin"; on_cell[coord] holds (object, slot) for all other jumper
+    ends and trace points, by the cell they are on. A slot is "a"/"b" for a
+    jumper and a point index for a trace.
+    """
+
+    def __init__(
+        self,
+        components: list[ComponentInstance],
+        jumpers: list[Jumper],
+        traces: list[Trace],
+    ):
+        self.anchored: dict[str, list[tuple[object, object, int]]] = {}
+        self.on_cell: dict[Coord, list[tuple[object, object]]] = {}
+        self._pin_index = {
+            c.ref: {pin.name: i for i, pin in enumerate(c.footprint.pins)}
+            for c in components
+        }
+        for j in jumpers:
+            self.add(j)
+        for tr in traces:
+            self.add(tr)
+
+    @staticmethod
+    def _points(obj) -> list[tuple[object, Coord, tuple[str, str] | None]]:
+        if isinstance(obj, Trace):
+            return [(i, p, obj.anchors.get(i)) for i, p in enumerate(obj.points)]
+        return [(attr, getattr(obj, attr), obj.anchors.get(attr)) for attr in ("a", "b")]
+
+    def add(self, obj: Jumper | Trace) -> None:
+        for slot, coord, anchor in self._points(obj):
+            if anchor is None:
+                self.on_cell.setdefault(coord, []).append((obj, slot))
+                continue
+            # привязка к детали, которой нет в индексе, двигаться не должна
+            pin = self._pin_index.get(anchor[0], {}).get(anchor[1])
+            if pin is not None:
+                self.anchored.setdefault(anchor[0], []).append((obj, slot, pin))
+
+    def remove(self, obj: Jumper | Trace) -> None:
+        for slot, coord, anchor in self._points(obj):
+            if anchor is None:
+                entries = self.on_cell.get(coord)
+                if entries:
+                    entries[:] = [e for e in entries if e[0] is not obj]
+            elif anchor[0] in self.anchored:
+                self.anchored[anchor[0]] = [e for e in self.anchored[anchor[0]] if e[0] is not obj]
+
+    def move_point(self, obj, slot, old: Coord, new: Coord) -> None:
+        entries = self.on_cell[old]
+        for k, e in enumerate(entries):
+            if e[0] is obj and e[1] == slot:
+                del entries[k]
+                break
+        if not entries:
+            del self.on_cell[old]
+        self.on_cell.setdefault(new, []).append((obj, slot))
+
+
+def _attached(
+    selection: list[ComponentInstance], index: WiringIndex
+) -> tuple[dict[int, tuple[object, list]], list[tuple[object, object, ComponentInstance, int]]]:
+    # объект -> слоты, которые сидят на выбранных пинах без привязки
+    touched: dict[int, tuple[object, list]] = {}
+    anchored: list[tuple[object, object, ComponentInstance, int]] = []
+    for comp in selection:
+        for obj, slot, pin in index.anchored.get(comp.ref, ()):
+            anchored.append((obj, slot, comp, pin))
+            touched.setdefault(id(obj), (obj, []))
+    for p in {p for comp in selection for p in comp.placed_pins()}:
+        for obj, slot in index.on_cell.get(p, ()):
+            touched.setdefault(id(obj), (obj, []))[1].append(slot)
+    return touched, anchored
+
+
+def attached_wiring(
+    selection: list[ComponentInstance], index: WiringIndex
+) -> tuple[list[Jumper], list[Trace]]:
+    """The jumpers and traces that transform_selection would change."""
+    touched, _ = _attached(selection, index)
+    objs = [obj for obj, _ in touched.values()]
+    return (
+        [o for o in objs if isinstance(o, Jumper)],
+        [o for o in objs if isinstance(o, Trace)],
+    )
+
+
+def transform_selection(
+    selection: list[ComponentInstance],
+    jumpers: list[Jumper],
+    traces: list[Trace],
+    t: Transform,
+    index: WiringIndex | None = None,
+) -> tuple[list[Jumper], list[Trace]]:
+    """Apply `t` to the selected components and the wiring attached to them.
+
+    Each component is placed so that its pins land where `t` sends them; a
+    mirror of a component whose footprint is not symmetric raises ValueError
+    before anything is changed. Points anchored to a selected pin
+    ("REF.pin") are put on that pin after the move. Other jumper ends
+    sitting on a selected pin follow the pin. A trace that lies entirely
+    inside the selection's pin bounds and touches one of its pins moves as
+    a whole (except points anchored elsewhere); other traces only get the
+    points that sit on selected pins moved. Only wiring found through
+    `index` is visited; without one, an index is built for this call.
+    Returns the jumpers and traces that were changed.
+    """
+    bounds = selection_bounds(selection)
+    if bounds is None:
+        return [], []
+    min_x, min_y, max_x, max_y = bounds
+    placements = [t.placement(comp) for comp in selection]
+    stuck = [comp.ref for comp, p in zip(selection, placements) if p is None]
+    if stuck:
+        raise ValueError(f"cannot mirror {' '.join(stuck)}: footprint is not symmetric")
+    if index is None:
+        index = WiringIndex(selection, jumpers, traces)
+
+    touched, anchored = _attached(selection, index)
+
+    # (объект, слот) для каждой координаты, которая двигается
+    slots: list[tuple[object, object]] = []
+    coords: list[Coord] = []
+
+    moved_jumpers: list[Jumper] = []
+    moved_traces: list[Trace] = []
+    for obj, on_pin in touched.values():
+        if isinstance(obj, Trace):
+            moved_traces.append(obj)
+            inside = all(min_x <= p.x <= max_x and min_y <= p.y <= max_y for p in obj.points)
+            if inside:
+                on_pin = [i for i in range(len(obj.points)) if i not in obj.anchors]
+            for i in on_pin:
+                slots.append((obj, i))
+                coords.append(obj.points[i])
+        else:
+            moved_jumpers.append(obj)
+            for attr in on_pin:
+                slots.append((obj, attr))
+                coords.append(getattr(obj, attr))
+
+    for (obj, slot), c in zip(slots, t.apply_all(coords)):
+        if isinstance(slot, int):
+            index.move_point(obj, slot, obj.points[slot], c)
+            obj.points[slot] = c
+        else:
+            index.move_point(obj, slot, getattr(obj, slot), c)
+            setattr(obj, slot, c)
+
+    for comp, (origin, rotation) in zip(selection, placements):
+        comp.origin = origin
+        comp.rotation = rotation
+
+    # привязанные точки — туда, где пин оказался после поворота
+    for obj, slot, comp, pin in anchored:
+        c = comp.origin.add(comp.footprint.pins[pin].offset.rotate(comp.rotation))
+        if isinstance(slot, int):
+            obj.points[slot] = c
+        else:
+            setattr(obj, slot, c)
+
+    return moved_jumpers, moved_traces